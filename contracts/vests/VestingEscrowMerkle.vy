@@ -0,0 +1,327 @@
+# @version 0.2.4
+"""
+@title Vesting Escrow with Merkle Claims
+@author Curve Finance
+@license MIT
+@notice Vests `ERC20CRV` tokens for many addresses committed to in a Merkle root
+@dev Unlike `VestingEscrow`, recipients are not funded by the admin. Each recipient
+     proves their allocation once, setting `initial_locked` from the tokens added
+     with `add_tokens`, and then claims as usual.
+     Leaves are `keccak256(concat(convert(recipient, bytes32), convert(amount, bytes32)))`
+     and pairs of nodes are sorted before hashing.
+"""
+
+
+from vyper.interfaces import ERC20
+
+event Fund:
+    recipient: indexed(address)
+    amount: uint256
+
+event Claim:
+    recipient: indexed(address)
+    claimed: uint256
+
+event ToggleDisable:
+    recipient: address
+    disabled: bool
+
+event CommitOwnership:
+    admin: address
+
+event ApplyOwnership:
+    admin: address
+
+
+# supports trees of up to 2**32 leaves. shorter proofs are padded with empty nodes
+MAX_PROOF_LENGTH: constant(uint256) = 32
+
+token: public(address)
+start_time: public(uint256)
+end_time: public(uint256)
+merkle_root: public(bytes32)
+merkle_total: public(uint256)
+initial_locked: public(HashMap[address, uint256])
+total_claimed: public(HashMap[address, uint256])
+
+initial_locked_supply: public(uint256)
+unallocated_supply: public(uint256)
+
+can_disable: public(bool)
+disabled_at: public(HashMap[address, uint256])
+
+admin: public(address)
+future_admin: public(address)
+
+
+@external
+def __init__(
+    _token: address,
+    _start_time: uint256,
+    _end_time: uint256,
+    _can_disable: bool,
+    _merkle_root: bytes32,
+    _total_amount: uint256
+):
+    """
+    @param _token Address of the ERC20 token being distributed
+    @param _start_time Timestamp at which the distribution starts. Should be in
+        the future, so that we have enough time to VoteLock everyone
+    @param _end_time Time until everything should be vested
+    @param _can_disable Whether admin can disable accounts in this deployment
+    @param _merkle_root Root of the Merkle tree of `(recipient, amount)` allocations
+    @param _total_amount Sum of every allocation in the tree, the amount to add
+        with `add_tokens`
+    """
+    assert _start_time >= block.timestamp
+    assert _end_time > _start_time
+
+    self.token = _token
+    self.admin = msg.sender
+    self.start_time = _start_time
+    self.end_time = _end_time
+    self.can_disable = _can_disable
+    self.merkle_root = _merkle_root
+    self.merkle_total = _total_amount
+
+
+@external
+def add_tokens(_amount: uint256):
+    """
+    @notice Transfer vestable tokens into the contract
+    @dev Recipients can only register while the tokens added cover their allocation
+    @param _amount Number of tokens to transfer
+    """
+    assert msg.sender == self.admin  # dev: admin only
+    assert ERC20(self.token).transferFrom(msg.sender, self, _amount)  # dev: transfer failed
+    self.unallocated_supply += _amount
+
+
+@internal
+@view
+def _verify_proof(
+    _recipient: address,
+    _amount: uint256,
+    _proof: bytes32[MAX_PROOF_LENGTH]
+) -> bool:
+    # the zero-padded address keeps leaves from being mistaken for internal nodes
+    node: bytes32 = keccak256(concat(convert(_recipient, bytes32), convert(_amount, bytes32)))
+    for sibling in _proof:
+        if sibling == EMPTY_BYTES32:
+            break
+        if convert(node, uint256) <= convert(sibling, uint256):
+            node = keccak256(concat(node, sibling))
+        else:
+            node = keccak256(concat(sibling, node))
+
+    return node == self.merkle_root
+
+
+@external
+@view
+def verify_proof(
+    _recipient: address,
+    _amount: uint256,
+    _proof: bytes32[MAX_PROOF_LENGTH]
+) -> bool:
+    """
+    @notice Check an allocation against the Merkle root
+    @param _recipient Address of the recipient
+    @param _amount Amount of vested tokens allocated to the recipient
+    @param _proof Sibling nodes from the leaf to the root, padded with empty nodes
+    @return bool Proof is valid
+    """
+    return self._verify_proof(_recipient, _amount, _proof)
+
+
+@internal
+def _register(_recipient: address, _amount: uint256, _proof: bytes32[MAX_PROOF_LENGTH]):
+    assert self.initial_locked[_recipient] == 0  # dev: already registered
+    assert _amount != 0  # dev: nothing to vest
+    assert self._verify_proof(_recipient, _amount, _proof)  # dev: invalid proof
+    assert self.unallocated_supply >= _amount  # dev: insufficient funding
+
+    self.initial_locked[_recipient] = _amount
+    self.initial_locked_supply += _amount
+    self.unallocated_supply -= _amount
+    log Fund(_recipient, _amount)
+
+
+@external
+@nonreentrant('lock')
+def register(_recipient: address, _amount: uint256, _proof: bytes32[MAX_PROOF_LENGTH]):
+    """
+    @notice Vest the tokens allocated to a recipient in the Merkle tree
+    @dev Callable by anyone, once per recipient
+    @param _recipient Address of the recipient
+    @param _amount Amount of vested tokens allocated to the recipient
+    @param _proof Sibling nodes from the leaf to the root, padded with empty nodes
+    """
+    self._register(_recipient, _amount, _proof)
+
+
+@external
+def toggle_disable(_recipient: address):
+    """
+    @notice Disable or re-enable a vested address's ability to claim tokens
+    @dev When disabled, the address is only unable to claim tokens which are still
+         locked at the time of this call. It is not possible to block the claim
+         of tokens which have already vested.
+    @param _recipient Address to disable or enable
+    """
+    assert msg.sender == self.admin  # dev: admin only
+    assert self.can_disable, "Cannot disable"
+
+    is_disabled: bool = self.disabled_at[_recipient] == 0
+    if is_disabled:
+        self.disabled_at[_recipient] = block.timestamp
+    else:
+        self.disabled_at[_recipient] = 0
+
+    log ToggleDisable(_recipient, is_disabled)
+
+
+@external
+def disable_can_disable():
+    """
+    @notice Disable the ability to call `toggle_disable`
+    """
+    assert msg.sender == self.admin  # dev: admin only
+    self.can_disable = False
+
+
+@internal
+@view
+def _total_vested_of(_recipient: address, _time: uint256 = block.timestamp) -> uint256:
+    start: uint256 = self.start_time
+    end: uint256 = self.end_time
+    locked: uint256 = self.initial_locked[_recipient]
+    if _time < start:
+        return 0
+    return min(locked * (_time - start) / (end - start), locked)
+
+
+@internal
+@view
+def _total_vested() -> uint256:
+    start: uint256 = self.start_time
+    end: uint256 = self.end_time
+    locked: uint256 = self.initial_locked_supply
+    if block.timestamp < start:
+        return 0
+    return min(locked * (block.timestamp - start) / (end - start), locked)
+
+
+@external
+@view
+def vestedSupply() -> uint256:
+    """
+    @notice Get the total number of tokens which have vested, that are held
+            by this contract
+    @dev Only includes tokens of registered recipients
+    """
+    return self._total_vested()
+
+
+@external
+@view
+def lockedSupply() -> uint256:
+    """
+    @notice Get the total number of tokens which are still locked
+            (have not yet vested)
+    """
+    return self.initial_locked_supply - self._total_vested()
+
+
+@external
+@view
+def vestedOf(_recipient: address) -> uint256:
+    """
+    @notice Get the number of tokens which have vested for a given address
+    @dev Zero until the recipient is registered
+    @param _recipient address to check
+    """
+    return self._total_vested_of(_recipient)
+
+
+@external
+@view
+def balanceOf(_recipient: address) -> uint256:
+    """
+    @notice Get the number of unclaimed, vested tokens for a given address
+    @param _recipient address to check
+    """
+    return self._total_vested_of(_recipient) - self.total_claimed[_recipient]
+
+
+@external
+@view
+def lockedOf(_recipient: address) -> uint256:
+    """
+    @notice Get the number of locked tokens for a given address
+    @param _recipient address to check
+    """
+    return self.initial_locked[_recipient] - self._total_vested_of(_recipient)
+
+
+@internal
+def _claim(addr: address):
+    t: uint256 = self.disabled_at[addr]
+    if t == 0:
+        t = block.timestamp
+    claimable: uint256 = self._total_vested_of(addr, t) - self.total_claimed[addr]
+    self.total_claimed[addr] += claimable
+    assert ERC20(self.token).transfer(addr, claimable)
+
+    log Claim(addr, claimable)
+
+
+@external
+@nonreentrant('lock')
+def claim(addr: address = msg.sender):
+    """
+    @notice Claim tokens which have vested
+    @dev The recipient must be registered
+    @param addr Address to claim tokens for
+    """
+    self._claim(addr)
+
+
+@external
+@nonreentrant('lock')
+def register_and_claim(_recipient: address, _amount: uint256, _proof: bytes32[MAX_PROOF_LENGTH]):
+    """
+    @notice Register a recipient and claim their vested tokens in one call
+    @param _recipient Address of the recipient
+    @param _amount Amount of vested tokens allocated to the recipient
+    @param _proof Sibling nodes from the leaf to the root, padded with empty nodes
+    """
+    self._register(_recipient, _amount, _proof)
+    self._claim(_recipient)
+
+
+@external
+def commit_transfer_ownership(addr: address) -> bool:
+    """
+    @notice Transfer ownership of VestingEscrowMerkle to `addr`
+    @param addr Address to have ownership transferred to
+    """
+    assert msg.sender == self.admin  # dev: admin only
+    self.future_admin = addr
+    log CommitOwnership(addr)
+
+    return True
+
+
+@external
+def apply_transfer_ownership() -> bool:
+    """
+    @notice Apply pending ownership transfer
+    """
+    assert msg.sender == self.admin  # dev: admin only
+    _admin: address = self.future_admin
+    assert _admin != ZERO_ADDRESS  # dev: admin not set
+    self.admin = _admin
+    log ApplyOwnership(_admin)
+
+    return True
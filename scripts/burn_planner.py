@@ -0,0 +1,148 @@
+"""
+Pack fee coins into `PoolProxy.burn_many` batches using learned gas costs.
+
+Rather than estimating gas after appending every coin, the planner keeps the
+gas used to burn each coin in past runs, cached on disk per proxy, and packs
+coins into batches that fit the gas budget. Only the final batches are
+estimated, and a batch that turns out too large is split in two.
+
+Coins must be burned in order when burners forward to each other, e.g. on
+mainnet. Otherwise batches are packed first-fit decreasing.
+"""
+from brownie import ZERO_ADDRESS
+
+from scripts.cache import load, store
+
+# number of coins accepted by `burn_many`
+BURN_MANY_SIZE = 20
+# gas assumed for a coin without burn history
+DEFAULT_BURN_GAS = 400000
+# gas of a `burn_many` call beyond the burns themselves
+BASE_GAS = 60000
+# weight of the latest run when updating a coin's gas cost
+LEARNING_RATE = 0.5
+
+
+class BurnPlanner:
+    """
+    Plan and execute `burn_many` calls for a pool proxy.
+
+    Arguments
+    ---------
+    proxy : Contract
+        `PoolProxy` or `PoolProxySidechain`.
+    gas_limit : int
+        Gas budget of a single `burn_many` call.
+    default_gas : int
+        Gas assumed for coins that have not been burned before.
+    """
+
+    def __init__(self, proxy, gas_limit, default_gas=DEFAULT_BURN_GAS):
+        self.proxy = proxy
+        self.gas_limit = gas_limit
+        self.default_gas = default_gas
+        self._cache_key = str(proxy).lower()
+        self.gas_profile = load("burn_gas", self._cache_key) or {}
+
+    def cost(self, coin):
+        """
+        Expected gas to burn `coin`.
+        """
+        return self.gas_profile.get(str(coin).lower(), self.default_gas)
+
+    def plan(self, coins, ordered=True):
+        """
+        Pack coins into batches within `gas_limit` and `BURN_MANY_SIZE`.
+
+        Arguments
+        ---------
+        coins : list
+            Coins to burn.
+        ordered : bool
+            Keep the given order across batches, filling each batch in turn.
+            If `False`, coins are packed first-fit decreasing.
+
+        Returns
+        -------
+        list
+            Lists of coins, one per `burn_many` call.
+        """
+        budget = self.gas_limit - BASE_GAS
+        if not ordered:
+            coins = sorted(coins, key=self.cost, reverse=True)
+
+        batches = []
+        used = []
+        for coin in coins:
+            cost = self.cost(coin)
+            if ordered:
+                fits = [len(batches) - 1] if batches else []
+            else:
+                fits = range(len(batches))
+            for i in fits:
+                if len(batches[i]) < BURN_MANY_SIZE and used[i] + cost <= budget:
+                    batches[i].append(coin)
+                    used[i] += cost
+                    break
+            else:
+                # a coin over budget on its own still gets a batch
+                batches.append([coin])
+                used.append(cost)
+
+        return batches
+
+    def burn(self, coins, tx_params, ordered=True):
+        """
+        Burn `coins` in planned batches, and learn from the gas used.
+
+        Arguments
+        ---------
+        coins : list
+            Coins to burn.
+        tx_params : dict
+            Transaction parameters for `burn_many`, including `from`.
+        ordered : bool
+            See `plan`.
+
+        Returns
+        -------
+        list
+            `TransactionReceipt` of each `burn_many` call.
+        """
+        txs = []
+        for batch in self.plan(coins, ordered):
+            txs += self._burn_batch(batch, tx_params)
+        return txs
+
+    def _burn_batch(self, batch, tx_params):
+        padded = list(batch) + [ZERO_ADDRESS] * (BURN_MANY_SIZE - len(batch))
+        if len(batch) > 1:
+            gas = self.proxy.burn_many.estimate_gas(padded, {"from": tx_params["from"]})
+            if gas > self.gas_limit:
+                # the profile underestimated this batch
+                middle = len(batch) // 2
+                return self._burn_batch(batch[:middle], tx_params) + self._burn_batch(
+                    batch[middle:], tx_params
+                )
+
+        tx = self.proxy.burn_many(padded, tx_params)
+        self.record(batch, tx.gas_used)
+        return [tx]
+
+    def record(self, batch, gas_used):
+        """
+        Update the gas profile from a `burn_many` call.
+
+        The gas used beyond `BASE_GAS` is split between the coins in proportion
+        to their expected cost.
+        """
+        expected = [self.cost(coin) for coin in batch]
+        gas_used = max(gas_used - BASE_GAS, 0)
+        for coin, cost in zip(batch, expected):
+            observed = gas_used * cost / sum(expected)
+            key = str(coin).lower()
+            if key in self.gas_profile:
+                observed = LEARNING_RATE * observed + (1 - LEARNING_RATE) * self.gas_profile[key]
+            self.gas_profile[key] = int(observed)
+
+        store("burn_gas", self._cache_key, self.gas_profile)
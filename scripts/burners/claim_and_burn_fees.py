@@ -1,11 +1,14 @@
-import sys
 import time
 import warnings
 
 import requests
-from brownie import ETH_ADDRESS, ZERO_ADDRESS, Contract, accounts
+from brownie import ETH_ADDRESS, ZERO_ADDRESS, accounts
 from brownie.network.gas.strategies import GasNowScalingStrategy
 
+from scripts.burn_planner import BurnPlanner
+from scripts.cache import get_contract, immutable_calls, registry_snapshot
+from scripts.multicall import Multicall, function_abi
+
 warnings.filterwarnings("ignore")
 
 # This script is used to claim fees from all pool contracts
@@ -20,6 +23,9 @@ CALLER = accounts.add()
 # minimum amount in USD required in order to claim fees from a pool
 CLAIM_THRESHOLD = 1000
 
+# gas budget of a single `burn_many` call - some of the burners are gas guzzlers
+BURN_GAS_LIMIT = 2000000
+
 # fee coins, organized by the fee burner they are handled with
 COINS = [
     # LP Burner - for withdrawing LP tokens
@@ -90,27 +96,24 @@ SYNTH_BURNERS = [
 ]
 
 
+# view functions called through multicall, without fetching the full ABI of every pool
+BALANCE_OF = function_abi("balanceOf", ["address"], ["uint256"])
+DECIMALS = function_abi("decimals", [], ["uint256"])
+ADMIN_BALANCES = function_abi("admin_balances", ["uint256"], ["uint256"])
+BALANCES = function_abi("balances", ["uint256"], ["uint256"])
+BALANCES_INT128 = function_abi("balances", ["int128"], ["uint256"])
+
 _rate_cache = {}
 gas_strategy = GasNowScalingStrategy(initial_speed="slow", max_speed="fast")
 
 
-def _get_pool_list():
-    sys.stdout.write("Getting list of pools from registry...")
-    sys.stdout.flush()
-
-    provider = Contract("0x0000000022D53366457F9d5E68Ec105046FC4383")
-    registry = Contract(provider.get_registry())
+def _get_pool_list(multicall):
+    print("Getting list of pools from registry...")
 
-    pool_count = registry.pool_count()
-    pool_list = {}
-    for i in range(pool_count):
-        sys.stdout.write(f"\rGetting list of pools from registry ({i+1}/{pool_count})...")
-        sys.stdout.flush()
-        swap = Contract(registry.pool_list(i))
-        pool_list[swap] = [i.lower() for i in registry.get_coins(swap) if i != ZERO_ADDRESS]
+    provider = get_contract("0x0000000022D53366457F9d5E68Ec105046FC4383")
+    registry = get_contract(provider.get_registry())
 
-    print()
-    return pool_list
+    return registry_snapshot(registry, multicall)
 
 
 def _fetch_rates(coin_list):
@@ -142,36 +145,49 @@ def _fetch_rates(coin_list):
     return rates
 
 
-def _get_admin_balances(pool, coin_list):
-    admin_balances = []
-
-    rates = _fetch_rates(coin_list)
-
-    for i, coin in enumerate(coin_list):
-        if hasattr(pool, "admin_balances"):
-            balance = pool.admin_balances(i)
-        else:
-            balance = Contract(coin).balanceOf(pool) - pool.balances(i)
-
-        if coin != ETH_ADDRESS.lower():
-            decimals = Contract(coin).decimals()
-        else:
-            decimals = 18
-        balance = balance / 10 ** decimals * rates[coin]
-        admin_balances.append(balance)
+def _get_admin_balances(pool_list, multicall):
+    # newer pools expose `admin_balances`, for older ones the admin balance is
+    # the difference between the actual coin balance and the pool's `balances`
+    calls = []
+    for pool, coin_list in pool_list.items():
+        for i, coin in enumerate(coin_list):
+            if coin == ETH_ADDRESS.lower():
+                calls.append(multicall.eth_balance(pool))
+            else:
+                calls.append((coin, BALANCE_OF, (pool,)))
+            calls += [
+                (pool, ADMIN_BALANCES, (i,)),
+                (pool, BALANCES, (i,)),
+                (pool, BALANCES_INT128, (i,)),
+            ]
+    coins = sorted(set(i for coin_list in pool_list.values() for i in coin_list))
+    decimals = dict(zip(coins, immutable_calls([(i, DECIMALS, ()) for i in coins], multicall)))
+    decimals[ETH_ADDRESS.lower()] = 18
+    results = iter(multicall(calls))
+
+    admin_balances = {}
+    for pool, coin_list in pool_list.items():
+        rates = _fetch_rates(coin_list)
+        admin_balances[pool] = []
+        for coin in coin_list:
+            coin_balance, admin_balance, balance, balance_int128 = [next(results) for i in range(4)]
+            if admin_balance is None:
+                pool_balance = balance if balance is not None else balance_int128
+                if coin_balance is None or pool_balance is None:
+                    admin_balance = 0
+                else:
+                    admin_balance = coin_balance - pool_balance
+            admin_balances[pool].append(admin_balance / 10 ** (decimals[coin] or 18) * rates[coin])
 
     return admin_balances
 
 
 def get_pending():
-    pool_list = _get_pool_list()
-    pending = {}
-    for i, (pool, coin_list) in enumerate(pool_list.items(), start=1):
-        sys.stdout.write(f"\rQuerying pending fee amounts ({i}/{len(pool_list)})...")
-        sys.stdout.flush()
-        pending[pool] = sum(_get_admin_balances(pool, coin_list))
-
-    print()
+    multicall = Multicall()
+    pool_list = _get_pool_list(multicall)
+    print("Querying pending fee amounts...")
+    pending = {k: sum(v) for k, v in _get_admin_balances(pool_list, multicall).items()}
+
     for addr, value in sorted(pending.items(), key=lambda k: k[1], reverse=True):
         print(f"{addr}: ${value:,.2f}")
 
@@ -181,62 +197,50 @@ def get_pending():
 
 
 def main(acct=CALLER, claim_threshold=CLAIM_THRESHOLD):
-    lp_tripool = Contract("0x6c3F90f043a72FA612cbac8115EE7e52BDe6E490")
-    distributor = Contract("0xA464e6DCda8AC41e03616F95f4BC98a13b8922Dc")
-    proxy = Contract("0xeCb456EA5365865EbAb8a2661B0c503410e9B347")
+    lp_tripool = get_contract("0x6c3F90f043a72FA612cbac8115EE7e52BDe6E490")
+    distributor = get_contract("0xA464e6DCda8AC41e03616F95f4BC98a13b8922Dc")
+    proxy = get_contract("0xeCb456EA5365865EbAb8a2661B0c503410e9B347")
 
     initial_balance = lp_tripool.balanceOf(distributor)
 
-    # get list of active pools
-    pool_list = _get_pool_list()
+    # get list of active pools and their claimable amounts
+    multicall = Multicall()
+    pool_list = _get_pool_list(multicall)
+    print("Querying pending fee amounts...")
+    pending = _get_admin_balances(pool_list, multicall)
 
     # withdraw pool fees to pool proxy
-    to_claim = []
-    for i in range(len(pool_list)):
-
-        # check claimable amount
-        sys.stdout.write(f"\rQuerying pending fee amounts ({i}/{len(pool_list)})...")
-        sys.stdout.flush()
-        claimable = _get_admin_balances(pool_list[i])
-        if sum(claimable) >= claim_threshold:
-            to_claim.append(pool_list[i])
-
-        if i == len(pool_list) - 1 or len(to_claim) == 20:
-            to_claim += [ZERO_ADDRESS] * (20 - len(to_claim))
-            proxy.withdraw_many(to_claim, {"from": acct, "gas_price": gas_strategy})
-            to_claim = []
-
-    # call burners to convert fee tokens to 3CRV
-    burn_start = 0
-    to_burn = []
-    for i in range(len(COINS)):
-        # no point in burning if we have a zero balance
-        if COINS[i] == ETH_ADDRESS:
-            if proxy.balance() > 0:
-                to_burn.append(COINS[i])
-        elif Contract(COINS[i]).balanceOf(proxy) > 0:
-            to_burn.append(COINS[i])
-
-        to_burn_padded = to_burn + [ZERO_ADDRESS] * (20 - len(to_burn))
-
-        # estimate gas to decide when to burn - some of the burners are gas guzzlers
-        if (
-            i == len(COINS) - 1
-            or proxy.burn_many.estimate_gas(to_burn_padded, {"from": acct}) > 2000000
-        ):
-            tx = proxy.burn_many(to_burn_padded, {"from": acct, "gas_price": gas_strategy})
-            to_burn = []
-            if not burn_start:
-                # record the timestamp of the first tx - need to
-                # know how long to wait to finalize synth swaps
-                burn_start = tx.timestamp
+    to_claim = [pool for pool, claimable in pending.items() if sum(claimable) >= claim_threshold]
+    for i in range(0, len(to_claim), 20):
+        withdraw_list = to_claim[i : i + 20]
+        withdraw_list += [ZERO_ADDRESS] * (20 - len(withdraw_list))
+        proxy.withdraw_many(withdraw_list, {"from": acct, "gas_price": gas_strategy})
+
+    # burners forward to other burners rather than back to the proxy,
+    # so the proxy balances can all be read up front
+    balances = multicall(
+        [
+            multicall.eth_balance(proxy) if coin == ETH_ADDRESS else (coin, BALANCE_OF, (proxy,))
+            for coin in COINS
+        ]
+    )
+
+    # call burners to convert fee tokens to 3CRV - no point in burning a zero balance
+    # coins are burned in order, as burners forward to each other
+    to_burn = [coin for coin, balance in zip(COINS, balances) if balance]
+    planner = BurnPlanner(proxy, BURN_GAS_LIMIT)
+    txs = planner.burn(to_burn, {"from": acct, "gas_price": gas_strategy})
+
+    # record the timestamp of the first tx - need to
+    # know how long to wait to finalize synth swaps
+    burn_start = txs[0].timestamp if txs else 0
 
     # wait on synths to finalize
     time.sleep(max(burn_start + 180 - time.time(), 0))
 
     # call `execute` on the underlying burner
     # deposits DAI/USDC/USDT into 3pool and transfers the 3CRV to the fee distributor
-    underlying_burner = Contract("0x874210cF3dC563B98c137927e7C951491A2e9AF3")
+    underlying_burner = get_contract("0x874210cF3dC563B98c137927e7C951491A2e9AF3")
     underlying_burner.execute({"from": acct, "gas_price": gas_strategy})
 
     # finally, call to burn 3CRV - this also triggers a token checkpoint
@@ -20,23 +20,33 @@ Steps for successful withdrawl:
 6. Once the burn tx has been checkpointed call the exit function
    `brownie run exit exit`
    - Do this in fork mode first ofcourse
+   - Several pending burns can be exited together with `withdraw_assets_on_ethereum`,
+     which builds each checkpoint's block proofs only once
 
 To test run: brownie run exit tester --network mainnet
 """
+import bisect
+import json
 import math
 from datetime import datetime
-from functools import wraps
-from typing import List, Tuple
+from functools import lru_cache, partial
+from typing import Dict, List, Optional, Tuple
 
+import requests
 import rlp
 from brownie import Contract, RootForwarder, accounts, chain, network, web3
 from brownie.project import get_loaded_projects
 from eth_utils import keccak
 from hexbytes import HexBytes
-from tqdm import tqdm, trange
+from tqdm import tqdm
 from trie import HexaryTrie
+from web3 import Web3
 from web3.types import BlockData, TxReceipt
 
+from scripts.cache import load, store
+from scripts.connections import connect
+from scripts.sampler import RetryableError, sample
+
 # Hard coded values for permanent proxy addresses
 ADDRS = {
     "mainnet": {
@@ -55,6 +65,15 @@ PreparedReceipt = Tuple[bytes, int, bytes, PreparedLogs]
 
 ADDRS["mainnet-fork"] = ADDRS["mainnet"]
 
+# number of block headers fetched per JSON-RPC batch request
+HEADER_BATCH_SIZE = 100
+# seconds before a stalled batch request fails and is retried by the sampler
+REQUEST_TIMEOUT = 60
+# Ethereum blocks per `eth_getLogs` request when indexing checkpoints
+CHECKPOINT_LOG_RANGE = 100000
+# confirmations before a checkpoint is indexed
+CHECKPOINT_CONFIRMATIONS = 12
+
 # MUST SET VARIABLES BEFORE BURNING ON MATIC
 MSG_SENDER = accounts.add()
 MATIC_ERC20_ASSET_ADDR = ""
@@ -79,58 +98,123 @@ def burn_asset_on_matic(asset=MATIC_ERC20_ASSET_ADDR, amount=BURN_AMOUNT, sender
     print(f"Visit https://explorer-mainnet.maticvigil.com/tx/{tx.txid} for confirmation")
 
 
-def hot_swap_network(environment_name):
-    """Decorator for hot swapping the network connection.
+class ChainConnections:
+    """Persistent connections to Ethereum and Polygon, routed by environment.
+
+    Brownie only holds one network connection at a time, and Polygon uses POA,
+    so swapping between the two means disconnecting and reconnecting. Instead,
+    the network brownie is connected to is used as is, and the other one gets
+    its own web3 provider, opened on first use and kept for the whole run.
+    """
 
-    There is probably a nicer way to do this but I'm lazy and this works.
-    This basically hot swaps to the network we want and then back to the
-    original network, useful for helper functions.
+    def network_id(self, environment_name: str) -> str:
+        """Brownie network id of an environment, e.g. 'ethereum' or 'polygon'."""
+        is_mainnet = "main" in network.show_active()
+        if environment_name == "ethereum":
+            return "mainnet" if is_mainnet else "goerli"
+        elif environment_name == "polygon":
+            return "polygon-main" if is_mainnet else "polygon-testnet"
+        raise ValueError(f"Unknown environment: {environment_name}")
 
-    Since we are swapping between Ethereum and Matic in this script
-    it's neccessary to terminate the RPC and reconnect since Matic
-    uses POA ... that sounds about right I really don't know but it works :)
+    def __getitem__(self, environment_name: str) -> Web3:
+        return connect(self.network_id(environment_name), poa=environment_name == "polygon")
 
-    Args:
-        environment_name: A valid environment name found in `brownie networks list`
-            e.g. 'ethereum', 'polygon'
+    @property
+    def ethereum(self) -> Web3:
+        return self["ethereum"]
+
+    @property
+    def polygon(self) -> Web3:
+        return self["polygon"]
+
+
+connections = ChainConnections()
+
+
+def _root_chain():
+    """RootChain contract on Ethereum."""
+    root_chain_proxy_addr = ADDRS[connections.network_id("ethereum")]["RootChainProxy"]
+    abi = get_loaded_projects()[0].interface.RootChain.abi
+    return connections.ethereum.eth.contract(root_chain_proxy_addr, abi=abi)
+
+
+class CheckpointIndex:
+    """Local index of the child chain block ranges checkpointed on Ethereum.
+
+    Built from RootChain `NewHeaderBlock` events and cached on disk, then synced
+    incrementally, so finding the checkpoint of a block is an in-memory bisect
+    instead of a binary search over `headerBlocks` calls. Events are only indexed
+    once they have `CHECKPOINT_CONFIRMATIONS` confirmations.
     """
 
-    def inner(func):
-        @wraps(func)
-        def wrapper(*args, **kwargs):
-            initial_network_id = network.show_active()
-            is_mainnet = "main" in initial_network_id
+    def __init__(self, root_chain):
+        self.root_chain = root_chain
+        self.w3 = root_chain.web3
+        self._cache_key = root_chain.address.lower()
 
-            if environment_name == "ethereum":
-                swap_network_id = "mainnet" if is_mainnet else "goerli"
-            elif environment_name == "polygon":
-                swap_network_id = "polygon-main" if is_mainnet else "polygon-testnet"
+        cached = load("checkpoints", self._cache_key, w3=self.w3) or {"block": -1, "headers": []}
+        self.synced_block = cached["block"]
+        # (start, end, header block id), ordered by start
+        self.headers = [tuple(i) for i in cached["headers"]]
 
-            if initial_network_id == swap_network_id:
-                return func(*args, **kwargs)
+    @property
+    def last_child_block(self) -> int:
+        """Last child chain block covered by an indexed checkpoint."""
+        return self.headers[-1][1] if self.headers else -1
 
-            network.disconnect()
-            network.connect(swap_network_id)
+    def _fetch_events(self, block_range: List[int]) -> List[list]:
+        events = self.root_chain.events.NewHeaderBlock.getLogs(
+            fromBlock=block_range[0], toBlock=block_range[1]
+        )
+        return [[i.args.start, i.args.end, i.args.headerBlockId] for i in events]
 
-            result = func(*args, **kwargs)
+    def sync(self) -> None:
+        """Index checkpoints added since the last sync."""
+        to_block = self.w3.eth.block_number - CHECKPOINT_CONFIRMATIONS
+        if to_block <= self.synced_block:
+            return
+
+        ranges = [
+            [i, min(i + CHECKPOINT_LOG_RANGE - 1, to_block)]
+            for i in range(self.synced_block + 1, to_block + 1, CHECKPOINT_LOG_RANGE)
+        ]
+        new_headers = [tuple(i) for events in sample(self._fetch_events, ranges) for i in events]
+        self.headers = sorted(set(self.headers + new_headers))
+        self.synced_block = to_block
+
+        value = {"block": self.synced_block, "headers": self.headers}
+        store("checkpoints", self._cache_key, value, w3=self.w3)
 
-            network.disconnect()
-            network.connect(initial_network_id)
+    def find(self, child_block_number: int) -> Optional[Tuple[int, int, int]]:
+        """Get the (start, end, header block id) of the checkpoint including a block.
+
+        Syncs first if the block is not covered yet. Returns `None` if the block
+        has not been checkpointed.
+        """
+        if child_block_number > self.last_child_block:
+            self.sync()
 
-            return result
+        index = bisect.bisect_right([i[0] for i in self.headers], child_block_number) - 1
+        if index >= 0 and self.headers[index][1] >= child_block_number:
+            return self.headers[index]
+        return None
 
-        return wrapper
 
-    return inner
+@lru_cache(maxsize=None)
+def checkpoint_index() -> CheckpointIndex:
+    """Checkpoint index of the RootChain on Ethereum."""
+    return CheckpointIndex(_root_chain())
 
 
 class MerkleTree:
-    """This is my poor but successful lvl 2 copy paste of a merkle tree."""
+    """Merkle tree of serialized blocks, used for building block proofs.
 
-    def __init__(self, leaves: bytes):
-        """Initialize and recursively build the Merkle tree.
+    Each layer is stored as a single contiguous bytes buffer of 32 byte nodes,
+    with the leaves padded to a power of two using zero hashes.
+    """
 
-        This is only used for building the block proof.
+    def __init__(self, leaves: List[bytes]):
+        """Initialize and build the Merkle tree.
 
         Args:
             leaves: Serialized blocks
@@ -139,112 +223,71 @@ class MerkleTree:
         tree_depth = math.ceil(math.log(len(leaves), 2))
         assert tree_depth <= 20, "Depth must be 20 layers or less"
 
-        self.leaves = leaves + [HexBytes(0) * 32] * (2 ** tree_depth - len(leaves))
-        self.layers = [self.leaves]
-        self.create_hashes(self.leaves)
+        padding = b"\x00" * 32 * (2 ** tree_depth - len(leaves))
+        self.layers = [b"".join(leaves) + padding]
+        while len(self.layers[-1]) > 32:
+            layer = self.layers[-1]
+            # nodes are hashed in pairs, 64 bytes at a time
+            self.layers.append(
+                b"".join(keccak(layer[i : i + 64]) for i in range(0, len(layer), 64))
+            )
 
     @property
     def root(self) -> bytes:
         """Get the tree root."""
-        return self.layers[-1][0]
-
-    def create_hashes(self, nodes: List[bytes]) -> None:
-        """Recursively build the layers of the tree."""
-        if len(nodes) == 1:
-            return
-
-        tree_level = []
-        for i in range(0, len(nodes), 2):
-            left, right = nodes[i : i + 2]
-            new_node = keccak256(left + right)
-            tree_level.append(new_node)
-
-        if len(nodes) % 2 == 1:
-            tree_level.append(nodes[-1])
-
-        self.layers.append(tree_level)
-        self.create_hashes(tree_level)
-
-    def get_proof(self, leaf: bytes) -> List[bytes]:
-        """Generate a proof for a leaf."""
-        index = self.leaves.index(leaf)
+        return HexBytes(self.layers[-1])
 
+    def get_proof(self, index: int) -> List[bytes]:
+        """Generate a proof for the leaf at `index`."""
         proof = []
-        sibling_index = None
-        for i in trange(len(self.layers) - 1, desc="Building merkle proof"):
-            if index % 2 == 0:
-                sibling_index = index + 1
-            else:
-                sibling_index = index - 1
-            index = index // 2
-            sibling_node = self.layers[i][sibling_index]
-            proof.append(sibling_node)
+        for layer in self.layers[:-1]:
+            sibling = (index ^ 1) * 32
+            proof.append(HexBytes(layer[sibling : sibling + 32]))
+            index //= 2
 
         return proof
 
+    def get_proofs(self, indexes: List[int]) -> List[List[bytes]]:
+        """Generate proofs for several leaves, e.g. many burns in one checkpoint."""
+        return [self.get_proof(index) for index in indexes]
+
 
-@hot_swap_network("polygon")
+@lru_cache(maxsize=None)
 def fetch_burn_tx_data(burn_tx_id: str = MATIC_BURN_TX_ID):
-    """Fetch burn tx data."""
-    tx = web3.eth.get_transaction(burn_tx_id)
-    tx_receipt = web3.eth.get_transaction_receipt(burn_tx_id)
-    tx_block = chain[tx["blockNumber"]]
+    """Fetch burn tx data.
+
+    Results are kept for the rest of the run, so polling for the checkpoint
+    does not fetch the burn tx again.
+    """
+    w3 = connections.polygon
+    tx = w3.eth.get_transaction(burn_tx_id)
+    tx_receipt = w3.eth.get_transaction_receipt(burn_tx_id)
+    tx_block = w3.eth.get_block(tx["blockNumber"])
 
     return tx, tx_receipt, tx_block
 
 
-@hot_swap_network("ethereum")
 def is_burn_checkpointed(burn_tx_id: str = MATIC_BURN_TX_ID, silent: bool = False) -> bool:
     """Check a burn tx has been checkpointed on Ethereum mainnet."""
     _, _, burn_tx_block = fetch_burn_tx_data(burn_tx_id)
-    root_chain_proxy_addr = ADDRS[network.show_active()]["RootChainProxy"]
-    abi = get_loaded_projects()[0].interface.RootChain.abi
-    root_chain = Contract.from_abi("RootChain", root_chain_proxy_addr, abi)
 
-    is_checkpointed = root_chain.getLastChildBlock() >= burn_tx_block["number"]
+    is_checkpointed = checkpoint_index().find(burn_tx_block["number"]) is not None
     if not silent:
         print(f"Has Burn TX been Checkpointed? {is_checkpointed}")
     return is_checkpointed
 
 
-@hot_swap_network("ethereum")
-def fetch_block_inclusion_data(child_block_number: int) -> dict:
+def fetch_block_inclusion_data(child_block_number: int) -> Tuple[int, int, int]:
     """Fetch burn tx checkpoint block inclusion data.
 
     Args:
         child_block_number: The block number of the burn tx was included in on
             the matic network
     """
-    CHECKPOINT_ID_INTERVAL = 10000
+    header = checkpoint_index().find(child_block_number)
+    assert header is not None, "Block has not been checkpointed"
 
-    root_chain_proxy_addr = ADDRS[network.show_active()]["RootChainProxy"]
-    abi = get_loaded_projects()[0].interface.RootChain.abi
-    root_chain = Contract.from_abi("RootChain", root_chain_proxy_addr, abi)
-
-    start = 1
-    end = root_chain.currentHeaderBlock() // CHECKPOINT_ID_INTERVAL
-
-    header_block_number = None
-    while start <= end:
-        if start == end:
-            header_block_number = start
-
-        middle = (start + end) // 2
-        header_block = root_chain.headerBlocks(middle * CHECKPOINT_ID_INTERVAL)
-        header_start = header_block["start"]
-        header_end = header_block["end"]
-
-        if header_start <= child_block_number <= header_end:
-            header_block_number = middle
-            break
-        elif header_start > child_block_number:
-            # child block was checkpointed after
-            end = middle - 1
-        elif header_end < child_block_number:
-            # child block was checkpointed before
-            start = middle + 1
-
-    return header_start, header_end, header_block_number * CHECKPOINT_ID_INTERVAL
+    return header
 
 
 def prepare_receipt(receipt: TxReceipt) -> PreparedReceipt:
@@ -297,48 +340,146 @@ def serialize_block(block: dict) -> bytes:
     return keccak256(block_number + timestamp + txs_root + receipts_root)
 
 
-@hot_swap_network("polygon")
+def _fetch_headers(w3: Web3, block_range: List[int]) -> List[list]:
+    """Fetch the fields of `serialize_block` for a range of blocks, in one request."""
+    block_numbers = range(*block_range)
+    uri = getattr(w3.provider, "endpoint_uri", None)
+    if not str(uri).startswith("http"):
+        # batching requires an HTTP provider
+        blocks = [w3.eth.get_block(block_number) for block_number in block_numbers]
+    else:
+        payload = [
+            {"jsonrpc": "2.0", "id": i, "method": "eth_getBlockByNumber", "params": [hex(n), False]}
+            for i, n in enumerate(block_numbers)
+        ]
+        response = requests.post(uri, json=payload, timeout=REQUEST_TIMEOUT).json()
+        if not isinstance(response, list) or any("result" not in i for i in response):
+            raise RetryableError(f"Failed to fetch blocks {block_range}: {response}")
+        blocks = [i["result"] for i in sorted(response, key=lambda k: k["id"])]
+
+    # raw JSON-RPC results hold hex strings, formatted web3 results hold ints
+    return [
+        [
+            int(block[key], 16) if isinstance(block[key], str) else block[key]
+            for key in ("number", "timestamp")
+        ]
+        + [HexBytes(block["transactionsRoot"]).hex(), HexBytes(block["receiptsRoot"]).hex()]
+        for block in blocks
+    ]
+
+
+def fetch_headers(block_start: int, block_end: int, w3: Web3 = web3) -> List[dict]:
+    """Fetch the headers of a checkpoint's blocks, as needed by `serialize_block`.
+
+    Blocks are requested `HEADER_BATCH_SIZE` at a time, concurrently. Headers of
+    a checkpoint never change, so they are cached on disk per checkpoint range.
+    """
+    cache_name = f"headers-{block_start}-{block_end}"
+    headers = load(cache_name, "headers", w3=w3)
+    if headers is None:
+        batches = [
+            [i, min(i + HEADER_BATCH_SIZE, block_end + 1)]
+            for i in range(block_start, block_end + 1, HEADER_BATCH_SIZE)
+        ]
+        print(f"Fetching {block_end - block_start + 1} block headers")
+        headers = [i for batch in sample(partial(_fetch_headers, w3), batches) for i in batch]
+        store(cache_name, "headers", headers, w3=w3)
+
+    fields = ["number", "timestamp", "transactionsRoot", "receiptsRoot"]
+    return [dict(zip(fields, header)) for header in headers]
+
+
+def build_block_proofs(
+    block_start: int, block_end: int, burn_tx_block_numbers: List[int]
+) -> List[List[bytes]]:
+    """Build merkle proofs for several burn tx blocks in the same checkpoint."""
+
+    checkpoint_blocks = fetch_headers(block_start, block_end, connections.polygon)
+    serialized_blocks = [
+        serialize_block(block) for block in tqdm(checkpoint_blocks, desc="Serializing blocks")
+    ]
+
+    merkle_tree = MerkleTree(serialized_blocks)
+
+    return merkle_tree.get_proofs([i - block_start for i in burn_tx_block_numbers])
+
+
 def build_block_proof(block_start: int, block_end: int, burn_tx_block_number: int) -> List[bytes]:
     """Build a merkle proof for the burn tx block."""
+    return build_block_proofs(block_start, block_end, [burn_tx_block_number])[0]
 
-    checkpoint_blocks = (
-        chain[block_number]
-        for block_number in trange(
-            block_start, block_end + 1, desc="Serializing blocks", unit="block"
-        )
-    )
-    serialized_blocks = list(map(serialize_block, checkpoint_blocks))
 
-    burn_tx_serialized_block = serialized_blocks[burn_tx_block_number - block_start]
-    merkle_tree = MerkleTree(serialized_blocks)
+def _format_receipt(receipt: dict) -> dict:
+    """Convert the integer fields of a raw JSON-RPC receipt used in serialization."""
+    receipt = dict(receipt)
+    for key in ("status", "cumulativeGasUsed", "transactionIndex", "type"):
+        if isinstance(receipt.get(key), str):
+            receipt[key] = int(receipt[key], 16)
+    return receipt
+
 
-    return merkle_tree.get_proof(burn_tx_serialized_block)
+def fetch_block_receipts(
+    block: BlockData, exclude: List[bytes] = (), w3: Web3 = web3
+) -> List[dict]:
+    """Fetch the receipts of the transactions in a block, except those in `exclude`.
 
+    Uses a single `eth_getBlockReceipts` request where the node supports it, and
+    otherwise fetches the receipts of each transaction concurrently.
+    """
+    exclude = set(HexBytes(tx_hash) for tx_hash in exclude)
+    try:
+        receipts = w3.manager.request_blocking("eth_getBlockReceipts", [hex(block["number"])])
+    except ValueError:
+        # method not supported by the node
+        receipts = None
 
-@hot_swap_network("polygon")
-def build_receipt_proof(burn_tx_receipt: TxReceipt, burn_tx_block: BlockData) -> List[bytes]:
-    """Build the burn_tx_receipt proof."""
+    if receipts:
+        receipts = [i for i in receipts if HexBytes(i["transactionHash"]) not in exclude]
+    else:
+        tx_hashes = [HexBytes(tx).hex() for tx in block["transactions"] if tx not in exclude]
+        receipts = sample(w3.eth.get_transaction_receipt, tx_hashes)
+    return [_format_receipt(receipt) for receipt in receipts]
+
+
+def build_receipts_trie(burn_tx_block: BlockData) -> HexaryTrie:
+    """Build the receipts trie of the burn tx block."""
     state_sync_tx_hash = keccak256(
         b"matic-bor-receipt-" + burn_tx_block["number"].to_bytes(8, "big") + burn_tx_block["hash"]
     )
-    receipts_trie = HexaryTrie({})
-    receipts = (
-        web3.eth.get_transaction_receipt(tx)
-        for tx in tqdm(burn_tx_block["transactions"], desc="Building receipts trie", unit="receipt")
-        if tx != state_sync_tx_hash
+    print("Fetching block receipts")
+    receipts = sorted(
+        fetch_block_receipts(burn_tx_block, [state_sync_tx_hash], connections.polygon),
+        key=lambda receipt: receipt["transactionIndex"],
     )
-    for tx_receipt in receipts:
-        path = rlp.encode(tx_receipt["transactionIndex"])
-        receipts_trie[path] = serialize_receipt(tx_receipt)
 
-    key = rlp.encode(burn_tx_receipt["transactionIndex"])
-    print("Building merkle proof")
-    proof = receipts_trie.get_proof(key)
+    receipts_trie = HexaryTrie({})
+    with receipts_trie.squash_changes() as batch:
+        for tx_receipt in tqdm(receipts, desc="Building receipts trie", unit="receipt"):
+            path = rlp.encode(tx_receipt["transactionIndex"])
+            batch[path] = serialize_receipt(tx_receipt)
 
     assert (
         receipts_trie.root_hash == burn_tx_block["receiptsRoot"]
     ), "Receipts trie root is incorrect"
 
+    return receipts_trie
+
+
+def build_receipt_proof(
+    burn_tx_receipt: TxReceipt, burn_tx_block: BlockData, receipts_trie: HexaryTrie = None
+) -> List[bytes]:
+    """Build the burn_tx_receipt proof.
+
+    A `receipts_trie` already built for the block may be given, e.g. when
+    several burns share a block.
+    """
+    if receipts_trie is None:
+        receipts_trie = build_receipts_trie(burn_tx_block)
+
+    key = rlp.encode(burn_tx_receipt["transactionIndex"])
+    print("Building merkle proof")
+    proof = receipts_trie.get_proof(key)
+
     return key, proof
 
 
@@ -382,44 +523,75 @@ def encode_payload(
     return rlp.encode(payload)
 
 
-def build_calldata(burn_tx_id: str = MATIC_BURN_TX_ID) -> bytes:
-    """Generate the calldata required for withdrawing ERC20 asset on Ethereum."""
-    assert is_burn_checkpointed(burn_tx_id)
+def build_calldatas(burn_tx_ids: List[str]) -> Dict[str, bytes]:
+    """Generate the exit calldata for several burn txs at once.
 
-    burn_tx, burn_tx_receipt, burn_tx_block = fetch_burn_tx_data(burn_tx_id)
-    log_index = find_log_index(burn_tx_receipt)
-    start, end, header_block_number = fetch_block_inclusion_data(burn_tx_block["number"])
-    block_proof = build_block_proof(start, end, burn_tx_block["number"])
-    path, receipt_proof = build_receipt_proof(burn_tx_receipt, burn_tx_block)
+    Burns are grouped by checkpoint, so the headers and block merkle tree of a
+    checkpoint are only built once, and burns sharing a block share its
+    receipts trie.
+    """
+    burns = {}
+    checkpoints = {}
+    for burn_tx_id in burn_tx_ids:
+        assert is_burn_checkpointed(burn_tx_id, True), f"{burn_tx_id} has not been checkpointed"
+        _, burn_tx_receipt, burn_tx_block = fetch_burn_tx_data(burn_tx_id)
+        burns[burn_tx_id] = (burn_tx_receipt, burn_tx_block)
+        checkpoint = fetch_block_inclusion_data(burn_tx_block["number"])
+        checkpoints.setdefault(checkpoint, []).append(burn_tx_id)
+
+    block_proofs = {}
+    for (start, end, _), ids in checkpoints.items():
+        block_numbers = [burns[i][1]["number"] for i in ids]
+        proofs = build_block_proofs(start, end, block_numbers)
+        block_proofs.update(zip(ids, proofs))
+
+    calldatas = {}
+    receipts_tries = {}
+    for (_, _, header_block_number), ids in checkpoints.items():
+        for burn_tx_id in ids:
+            burn_tx_receipt, burn_tx_block = burns[burn_tx_id]
+            if burn_tx_block["number"] not in receipts_tries:
+                receipts_tries[burn_tx_block["number"]] = build_receipts_trie(burn_tx_block)
+            path, receipt_proof = build_receipt_proof(
+                burn_tx_receipt, burn_tx_block, receipts_tries[burn_tx_block["number"]]
+            )
+
+            calldatas[burn_tx_id] = encode_payload(
+                header_block_number,
+                block_proofs[burn_tx_id],
+                burn_tx_block["number"],
+                burn_tx_block["timestamp"],
+                burn_tx_block["transactionsRoot"],
+                burn_tx_block["receiptsRoot"],
+                burn_tx_receipt,
+                receipt_proof,
+                path,
+                find_log_index(burn_tx_receipt),
+            )
+
+    return calldatas
 
-    calldata = encode_payload(
-        header_block_number,
-        block_proof,
-        burn_tx_block["number"],
-        burn_tx_block["timestamp"],
-        burn_tx_block["transactionsRoot"],
-        burn_tx_block["receiptsRoot"],
-        burn_tx_receipt,
-        receipt_proof,
-        path,
-        log_index,
-    )
-    return calldata
 
+def build_calldata(burn_tx_id: str = MATIC_BURN_TX_ID) -> bytes:
+    """Generate the calldata required for withdrawing ERC20 asset on Ethereum."""
+    return build_calldatas([burn_tx_id])[burn_tx_id]
 
-def withdraw_asset_on_ethereum(burn_tx_id: str = MATIC_BURN_TX_ID, sender=MSG_SENDER):
+
+def withdraw_assets_on_ethereum(burn_tx_ids: List[str], sender=MSG_SENDER):
+    """Exit several burn txs, writing all of their calldata to one file first."""
     print("Building Calldata")
-    calldata = build_calldata(burn_tx_id)
-    fp = f"withdraw-calldata-{datetime.now().isoformat()}.txt"
+    calldatas = build_calldatas(burn_tx_ids)
+    fp = f"withdraw-calldata-{datetime.now().isoformat()}.json"
     with open(fp, "w") as f:
-        f.write(calldata.hex())
+        json.dump({k: v.hex() for k, v in calldatas.items()}, f, indent=2)
 
     root_chain_mgr_proxy_addr = ADDRS[network.show_active()]["RootChainManagerProxy"]
     abi = get_loaded_projects()[0].interface.RootChainManager.abi
     root_chain_mgr = Contract.from_abi("RootChainManager", root_chain_mgr_proxy_addr, abi)
 
     print("Calling Exit Function on Root Chain Manager")
-    root_chain_mgr.exit(calldata, {"from": sender, "priority_fee": "2 gwei"})
+    for calldata in calldatas.values():
+        root_chain_mgr.exit(calldata, {"from": sender, "priority_fee": "2 gwei"})
 
     # transfer USDC out of the root receiver
     usdc = "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48"
@@ -427,6 +599,10 @@ def withdraw_asset_on_ethereum(burn_tx_id: str = MATIC_BURN_TX_ID, sender=MSG_SE
     root_receiver.transfer(usdc, {"from": sender, "priority_fee": "2 gwei"})
 
 
+def withdraw_asset_on_ethereum(burn_tx_id: str = MATIC_BURN_TX_ID, sender=MSG_SENDER):
+    withdraw_assets_on_ethereum([burn_tx_id], sender)
+
+
 def main():
 
     route = input(
@@ -435,6 +611,7 @@ Choose an option:
 (1) Burn an asset on Matic
 (2) Withdraw an asset on Ethereum
 (3) Check burn tx checkpoint
+(4) Withdraw several assets on Ethereum
 Choice: """
     )
     try:
@@ -459,6 +636,14 @@ Choice: """
             else MSG_SENDER
         )
         withdraw_asset_on_ethereum(burn_tx_hash, sender)
+    elif route == 4:
+        burn_tx_hashes = input("Input matic burn tx hashes, comma separated: ")
+        sender = (
+            accounts.load(input("Account name: "))
+            if input("Do you want to load an account? [y/N] ") == "y"
+            else MSG_SENDER
+        )
+        withdraw_assets_on_ethereum([i.strip() for i in burn_tx_hashes.split(",")], sender)
     elif route == 3:
         burn_tx_hash = input("Enter burn tx hash: ")
         bar_fmt = "Blocks Mined: {n} blocks - Time Elapsed: {elapsed}"
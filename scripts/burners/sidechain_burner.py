@@ -0,0 +1,117 @@
+"""
+Fee burning pipeline shared by the sidechain burn scripts.
+
+Each chain is described in `CHAINS`, so supporting a new sidechain only needs a
+new entry and a script calling `burn_fees`. A run:
+
+1. Reads the pools and coins in the registry, from the on-disk snapshot.
+2. Broadcasts every `withdraw_many` chunk at once and waits for all of them.
+3. Reads every coin balance of the proxy concurrently, skipping empty ones.
+4. Burns the remaining coins in batches planned by `BurnPlanner`.
+5. Bridges the resulting coin back to Ethereum.
+"""
+from brownie import ZERO_ADDRESS, PoolProxySidechain, web3
+from eth_utils import to_checksum_address
+
+from scripts.burn_planner import BurnPlanner
+from scripts.cache import get_contract, registry_snapshot
+from scripts.multicall import function_abi
+from scripts.sampler import sample
+from scripts.tx_runner import TxRunner
+
+ADDRESS_PROVIDER = "0x0000000022D53366457F9d5E68Ec105046FC4383"
+BALANCE_OF = function_abi("balanceOf", ["address"], ["uint256"])
+# number of pools accepted by `withdraw_many`
+WITHDRAW_MANY_SIZE = 20
+
+CHAINS = {
+    "polygon": {
+        "proxy": "0xd6930b7f661257DA36F93160149b031735237594",
+        # coin bridged back to Ethereum, which every burner converts to
+        "bridge_coin": ("0x2791bca1f2de4661ed88a30c99a7a9449aa84174", "USDC", 6),
+        # coins to burn that are not in the registry
+        "extra_coins": ["0xdad97f7713ae9437fa9249920ec8507e5fbb23d3"],  # tricrypto3
+        "tx_params": {"gas_price": "30 gwei"},
+        # gas budget of a single `burn_many` call
+        "burn_gas_limit": 4000000,
+        "exit_note": (
+            "Use `brownie run burners/exit_polygon --network mainnet` to claim on ETH"
+            " once the checkpoint is added."
+        ),
+    },
+    "fantom": {
+        "proxy": "0xffbACcE0CC7C19d46132f1258FC16CF6871D153c",
+        "bridge_coin": ("0x049d68029688eabf473097a2fc38ef61633a3c7a", "USDT", 6),
+        "extra_coins": ["0x58e57ca18b7a47112b877e31929798cd3d703b0f"],  # tricrypto
+        "tx_params": {},
+        "burn_gas_limit": 4000000,
+    },
+}
+
+
+def _get_pool_list():
+    print("Getting list of pools and coins from registry...")
+
+    provider = get_contract(ADDRESS_PROVIDER)
+    registry = get_contract(provider.get_registry())
+
+    pools = registry_snapshot(registry)
+    pool_list = list(pools)
+    coin_list = set(i for coins in pools.values() for i in coins)
+
+    return pool_list, coin_list
+
+
+def _balance_of(proxy, coin):
+    token = web3.eth.contract(to_checksum_address(coin), abi=[BALANCE_OF])
+    return token.functions.balanceOf(str(proxy)).call()
+
+
+def burn_fees(chain_name, acct):
+    """
+    Claim, burn and bridge the admin fees of every pool on a sidechain.
+
+    Arguments
+    ---------
+    chain_name : str
+        Key of the chain in `CHAINS`.
+    acct : Account
+        Account to send transactions from.
+    """
+    config = CHAINS[chain_name]
+    proxy = PoolProxySidechain.at(config["proxy"])
+    bridge_coin, symbol, decimals = config["bridge_coin"]
+
+    pool_list, coin_list = _get_pool_list()
+
+    # withdrawals are independent, so every chunk is broadcast at once
+    runner = TxRunner(acct)
+    for i in range(0, len(pool_list), WITHDRAW_MANY_SIZE):
+        to_claim = pool_list[i : i + WITHDRAW_MANY_SIZE]
+        to_claim += [ZERO_ADDRESS] * (WITHDRAW_MANY_SIZE - len(to_claim))
+        runner.submit(
+            f"withdraw_many {i}", proxy.withdraw_many, to_claim, tx_params=config["tx_params"]
+        )
+    for label, tx in runner.wait().items():
+        if tx is None or tx.status != 1:
+            raise ValueError(f"{label} failed")
+
+    coin_list.discard(bridge_coin)
+    coin_list.update(config["extra_coins"])
+    coin_list = sorted(coin_list)
+
+    balances = sample(lambda coin: _balance_of(proxy, coin), coin_list)
+    to_burn = [coin for coin, balance in zip(coin_list, balances) if balance]
+
+    tx_params = dict(config["tx_params"], **{"from": acct})
+    planner = BurnPlanner(proxy, config["burn_gas_limit"])
+    planner.burn(to_burn, tx_params, ordered=False)
+
+    amount = _balance_of(proxy, bridge_coin)
+    tx = proxy.bridge(bridge_coin, tx_params)
+    print(
+        f"Burning phase 1 complete!\nAmount: {amount/10**decimals:,.2f} {symbol}\n"
+        f"Bridge txid: {tx.txid}"
+    )
+    if "exit_note" in config:
+        print(f"\n{config['exit_note']}")
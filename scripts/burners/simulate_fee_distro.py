@@ -1,24 +1,32 @@
 import json
+import random
 from pathlib import Path
 
 from brownie import Contract, FeeDistributor, accounts, chain
 
+from scripts.models.fee_distributor import FeeDistributorModel
+from scripts.models.voting_escrow import VotingEscrowModel
+
+# block the veCRV log replay starts at (VotingEscrow deployment)
+VE_DEPLOY_BLOCK = 10647813
+# number of accounts to also claim for on-chain, to verify the offline results
+SPOT_CHECK = 10
+# veCRV locks for up to four years, unlike the Ribbon `VotingEscrow`
+VECRV_MAXTIME = 4 * 365 * 86400
+
 
 def main():
     alice = accounts[0]
-    fee_token = Contract("0x6c3F90f043a72FA612cbac8115EE7e52BDe6E490")
     voting_escrow = Contract("0x5f3b5dfeb7b28cdbd7faba78963ee202a494e2a2")
 
     # sept 17, 2020 - 2 days before admin fee collection begins
     start_time = 1600300800
     distributor = FeeDistributor.deploy(
-        voting_escrow, start_time, fee_token, alice, alice, {"from": alice}
+        voting_escrow, start_time, alice, alice, alice, {"from": alice}
     )
 
-    # transfer 2m USD of 3CRV
-    fee_token.mint(
-        distributor, 2000000 * 10 ** 18, {"from": "0xbebc44782c7db0a1a60cb6fe97d0b483032ff1c7"}
-    )
+    # transfer 2000 ETH of fees
+    alice.transfer(distributor, "2000 ether")
 
     distributor.checkpoint_token()
     distributor.checkpoint_total_supply()
@@ -28,18 +36,33 @@ def main():
 
     with Path("votelocks-11237343.json").open() as fp:
         data = json.load(fp)
-    data = set([i["provider"] for i in data])
+    data = sorted(set([i["provider"] for i in data]))
+
+    # replay every lock once and compute all claims offline
+    ve_model = VotingEscrowModel.from_contract(
+        voting_escrow, VE_DEPLOY_BLOCK, chain.height, maxtime=VECRV_MAXTIME
+    )
+    model = FeeDistributorModel.from_contract(distributor, ve_model)
+    weeks, amounts = model.claimable_per_week(data)
+    totals = dict(zip(data, amounts.sum(axis=1)))
 
-    for c, acct in enumerate(data):
-        print(f"Claiming, {c}/{len(data)}")
+    total = sum(totals.values())
+    print(f"Claimable by {len(data)} accounts over {len(weeks)} weeks: {total/1e18:,.4f} ETH")
+    print(f"Remaining fee balance: {(distributor.balance() - total)/1e18:,.4f} ETH")
 
-        # ensure we claim up to the user's max epoch, some accounts require multiple claims
-        max_epoch = voting_escrow.user_point_epoch(acct)
-        epoch = 0
+    # claim for a random sample on-chain to confirm the model
+    for c, acct in enumerate(random.sample(data, min(SPOT_CHECK, len(data)))):
+        print(f"Spot check {c + 1}/{SPOT_CHECK}: {acct}")
 
-        while epoch < max_epoch:
-            distributor.claim({"from": acct})
-            epoch = distributor.user_epoch_of(acct)
+        # some accounts require multiple claims, repeat until nothing is left to claim
+        claimed = 0
+        while True:
+            tx = distributor.claim(acct, {"from": alice})
+            claimed += tx.return_value
+            if "Claimed" not in tx.events:
+                break
+            event = tx.events["Claimed"]
+            if event["claim_epoch"] >= event["max_epoch"] and tx.return_value == 0:
+                break
 
-    amount = fee_token.balanceOf(distributor)
-    print(f"Remaining fee balance: ${amount/1e18:,.2f}")
+        assert claimed == totals[acct], f"{acct}: claimed {claimed}, expected {totals[acct]}"
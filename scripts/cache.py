@@ -0,0 +1,197 @@
+"""
+On-disk cache for data that is expensive to fetch and rarely changes.
+
+* Contract ABIs, so `get_contract` does not query the block explorer again.
+  Brownie only persists these for live networks, not for forks.
+* Immutable view call results, such as `decimals` or a pool's `coins`.
+* Block-pinned snapshots, such as a registry's pool list, which are reused until
+  they are more than `max_age` blocks old.
+
+Entries are stored as JSON under `CACHE_PATH`, in a directory per chain. Chains
+are identified by their genesis hash. Development networks and forks are also
+keyed by the brownie network id, so state that only exists on a fork is never
+stored as live data. Delete the directory to clear the cache.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from brownie import ZERO_ADDRESS, Contract, network, web3
+from brownie._config import CONFIG
+
+CACHE_PATH = Path(os.environ.get("RIBBONOMICS_CACHE", Path(__file__).parent.parent / ".cache"))
+# snapshots older than this many blocks are fetched again
+MAX_SNAPSHOT_AGE = 500000
+
+_chain_keys = {}
+_namespaces = {}
+
+
+def _chain_key(w3):
+    suffix = ""
+    if w3 is None or w3 is web3:
+        w3 = web3
+        network_id = network.show_active()
+        if CONFIG.network_type == "development":
+            suffix = f"-{network_id}"
+    else:
+        # other connections are live chains, see `scripts.connections`
+        network_id = None
+
+    # brownie creates a new provider on every connect, e.g. when switching between
+    # networks that share an endpoint, so the key is only reused for the same one
+    memo = (network_id, getattr(w3.provider, "endpoint_uri", None))
+    if memo not in _chain_keys or _chain_keys[memo][0] is not w3.provider:
+        _chain_keys[memo] = (w3.provider, w3.eth.get_block(0).hash.hex()[:18] + suffix)
+    return _chain_keys[memo][1]
+
+
+def _namespace(name, w3=None):
+    path = CACHE_PATH.joinpath(_chain_key(w3), f"{name}.json")
+    if path not in _namespaces:
+        _namespaces[path] = json.loads(path.read_text()) if path.exists() else {}
+    return path, _namespaces[path]
+
+
+def load(name, key, block=None, max_age=None, w3=None):
+    """
+    Load a cached value.
+
+    Arguments
+    ---------
+    name : str
+        Cache namespace.
+    key : str
+        Entry key within the namespace.
+    block : int, optional
+        Current block height. When given, entries stored after this block, or
+        more than `max_age` blocks before it, are ignored.
+    max_age : int, optional
+        Maximum age of the entry, in blocks.
+    w3 : Web3, optional
+        Connection to the chain the entry belongs to. Defaults to the network
+        brownie is connected to.
+
+    Returns
+    -------
+    Cached value, or `None` if there is no valid entry.
+    """
+    entry = _namespace(name, w3)[1].get(key)
+    if entry is None:
+        return None
+    if block is not None:
+        if entry["block"] is None or entry["block"] > block:
+            return None
+        if max_age is not None and block - entry["block"] > max_age:
+            return None
+    return entry["value"]
+
+
+def store(name, key, value, block=None, w3=None):
+    """
+    Store a JSON-serializable value, optionally pinned to the block it was read at.
+    """
+    store_many(name, {key: value}, block, w3)
+
+
+def store_many(name, values, block=None, w3=None):
+    """
+    Store several values at once, writing the namespace to disk a single time.
+    """
+    if not values:
+        return
+    path, entries = _namespace(name, w3)
+    for key, value in values.items():
+        entries[key] = {"block": block, "value": value}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # written to a temporary file first, so a crash mid-write leaves the old file intact
+    with tempfile.NamedTemporaryFile("w", dir=path.parent, suffix=".tmp", delete=False) as fp:
+        try:
+            json.dump(entries, fp)
+        except BaseException:
+            fp.close()
+            os.remove(fp.name)
+            raise
+    os.replace(fp.name, path)
+
+
+def get_contract(address):
+    """
+    `Contract(address)`, with the ABI cached on disk.
+    """
+    address = str(address).lower()
+    cached = load("abi", address)
+    if cached is None:
+        contract = Contract(address)
+        store("abi", address, [contract._name, contract.abi])
+        return contract
+    return Contract.from_abi(cached[0], address, cached[1])
+
+
+def _call(multicall, calls, block_identifier=None):
+    if multicall is not None:
+        return multicall(calls, block_identifier=block_identifier)
+    # without multicall, `method` must be a brownie contract method on `target`
+    return [method(*args, block_identifier=block_identifier) for target, method, args in calls]
+
+
+def immutable_calls(calls, multicall=None):
+    """
+    Results of view calls that never change, e.g. `decimals`.
+
+    Results are cached forever, only uncached calls are made. Calls that revert
+    are not cached.
+
+    Arguments
+    ---------
+    calls : list
+        `(target, method, args)` tuples, as accepted by `Multicall`.
+    multicall : Multicall, optional
+        Used to make the uncached calls. If not given, they are made one at a time.
+    """
+    keys = []
+    for target, method, args in calls:
+        abi = getattr(method, "abi", method)
+        types = ",".join(i["type"] for i in abi["inputs"])
+        keys.append(f"{str(target).lower()}.{abi['name']}({types}){json.dumps(list(args))}")
+
+    results = [load("calls", key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    for i, result in zip(missing, _call(multicall, [calls[i] for i in missing])):
+        results[i] = result
+    store_many("calls", {keys[i]: results[i] for i in missing if results[i] is not None})
+
+    return results
+
+
+def registry_snapshot(registry, multicall=None, block=None, max_age=MAX_SNAPSHOT_AGE):
+    """
+    Pools in a Curve registry and their coins, as `{pool: [coin, ...]}`.
+
+    A cached snapshot is reused while it is at most `max_age` blocks old, and
+    the registry's `pool_count` and last pool are unchanged. Pool coins never
+    change, so on refresh only coins of new pools are fetched.
+    """
+    if block is None:
+        block = web3.eth.block_number
+    key = str(registry).lower()
+
+    pool_count = registry.pool_count(block_identifier=block)
+    snapshot = load("registry", key, block, max_age)
+    if snapshot is not None and len(snapshot) == pool_count:
+        if not pool_count or registry.pool_list(pool_count - 1, block_identifier=block).lower() == (
+            snapshot[-1][0]
+        ):
+            return dict(snapshot)
+
+    calls = [(registry, registry.pool_list, (i,)) for i in range(pool_count)]
+    pools = [i.lower() for i in _call(multicall, calls, block)]
+    coins = immutable_calls([(registry, registry.get_coins, (i,)) for i in pools], multicall)
+    snapshot = [
+        [pool, [i.lower() for i in coin_list if i != ZERO_ADDRESS]]
+        for pool, coin_list in zip(pools, coins)
+    ]
+
+    store("registry", key, snapshot, block)
+    return dict(snapshot)
@@ -0,0 +1,47 @@
+"""
+Web3 connections to networks other than the one brownie is connected to.
+
+Brownie holds a single network connection, and switching means disconnecting
+and reconnecting. `connect` instead opens an independent provider for any
+network in brownie's config, kept open for the rest of the run, so several
+chains can be read from at once.
+"""
+import os
+
+from brownie import network, web3
+from brownie._config import CONFIG
+from web3 import HTTPProvider, Web3, WebsocketProvider
+from web3.middleware import geth_poa_middleware
+
+_connections = {}
+
+
+def connect(network_id, poa=False):
+    """
+    Web3 connection to a brownie network.
+
+    Arguments
+    ---------
+    network_id : str
+        Network id as listed by `brownie networks list`, e.g. `polygon-main`.
+    poa : bool
+        Inject the POA middleware, needed to read blocks on chains such as Polygon.
+
+    Returns
+    -------
+    Web3
+        brownie's own connection if `network_id` is the active network,
+        otherwise a dedicated connection.
+    """
+    if network.show_active() == network_id:
+        return web3
+
+    if network_id not in _connections:
+        host = os.path.expandvars(CONFIG.networks[network_id]["host"])
+        provider = WebsocketProvider(host) if host.startswith("ws") else HTTPProvider(host)
+        w3 = Web3(provider)
+        if poa:
+            w3.middleware_onion.inject(geth_poa_middleware, layer=0)
+        _connections[network_id] = w3
+
+    return _connections[network_id]
@@ -0,0 +1,102 @@
+"""
+Exact integer allocation of a token amount by weight.
+
+`allocate` splits `total` between recipients in proportion to their weights
+using the largest remainder method: each recipient receives the floor of their
+exact share, and the units left over go to the recipients with the largest
+remainders, one each. The result always sums to `total`, and no recipient is
+more than one unit away from their exact share.
+
+Weights may be `int`, `Decimal`, `Fraction` or `float`, and are converted to
+integers without loss before dividing, so there is no rounding to correct
+afterwards. The arithmetic runs on numpy arrays, falling back to object arrays
+of Python integers only when the products could overflow `int64`.
+"""
+from fractions import Fraction
+from functools import reduce
+from math import gcd
+
+import numpy as np
+
+INT64_MAX = 2 ** 63 - 1
+
+
+def _lcm(a, b):
+    return a * b // gcd(a, b)
+
+
+def _to_integers(weights):
+    # exact integer weights with the same ratios
+    if all(isinstance(i, (int, np.integer)) for i in weights):
+        return [int(i) for i in weights]
+    fractions = [Fraction(i) for i in weights]
+    denominator = reduce(_lcm, {i.denominator for i in fractions}, 1)
+    return [i.numerator * (denominator // i.denominator) for i in fractions]
+
+
+def allocate(total, weights):
+    """
+    Split an integer amount in proportion to the given weights.
+
+    Arguments
+    ---------
+    total : int
+        Amount to distribute, in the token's smallest unit.
+    weights : list
+        Non-negative weight of each recipient, e.g. a share of the total.
+        Weights do not need to sum to one.
+
+    Returns
+    -------
+    ndarray
+        Amount of each recipient, in the order of `weights`. Sums to `total`.
+        Recipients with a weight of zero receive nothing.
+
+    Raises
+    ------
+    ValueError
+        If a weight is negative, or all weights are zero.
+    """
+    weights = _to_integers(weights)
+    weight_total = sum(weights)
+    if weights and min(weights) < 0:
+        raise ValueError("Weights must not be negative")
+    if not weight_total:
+        raise ValueError("Weights must not all be zero")
+
+    # intermediate values are at most `total * weight_total`
+    dtype = np.int64 if total * weight_total <= INT64_MAX else object
+    weights = np.array(weights, dtype=dtype)
+
+    # `divmod` is not implemented for object arrays
+    products = weights * total
+    amounts = products // weight_total
+    remainders = products % weight_total
+    leftover = int(total - amounts.sum())
+
+    # stable, so equal remainders are resolved in favour of earlier recipients
+    order = np.argsort(-remainders, kind="stable")
+    amounts[order[:leftover]] += 1
+
+    return amounts
+
+
+def allocate_to(total, shares):
+    """
+    Split an integer amount between addresses, as `allocate`.
+
+    Arguments
+    ---------
+    total : int
+        Amount to distribute.
+    shares : dict
+        `{address: weight}`.
+
+    Returns
+    -------
+    dict
+        `{address: amount}`, in the same order as `shares`. Usable as the
+        `recipients` of a `STANDARD_ESCROWS` entry.
+    """
+    amounts = allocate(total, list(shares.values()))
+    return {addr: int(amount) for addr, amount in zip(shares, amounts)}
@@ -0,0 +1,47 @@
+"""
+Batched verification of `VestingEscrow` allocations.
+
+`initial_locked` is read for hundreds of recipients per `eth_call` through
+`Multicall2`, and compared against the expected amounts as arrays.
+"""
+import numpy as np
+
+from scripts.multicall import Multicall
+
+
+def verify_initial_locked(escrow, recipients, expected, multicall=None):
+    """
+    Check the `initial_locked` balance of every recipient of an escrow.
+
+    Arguments
+    ---------
+    escrow : Contract
+        `VestingEscrow` to verify.
+    recipients : list
+        Recipient addresses.
+    expected : list
+        Expected `initial_locked` of each recipient.
+    multicall : Multicall, optional
+        Used to aggregate the calls. Created for the active network if not given.
+
+    Raises
+    ------
+    ValueError
+        For the first recipient whose balance does not match.
+    """
+    if multicall is None:
+        multicall = Multicall()
+
+    calls = [(escrow, escrow.initial_locked, (i,)) for i in recipients]
+    actual = np.array(multicall(calls), dtype=object)
+    expected = np.array(expected, dtype=object)
+
+    mismatches = np.flatnonzero((actual != expected).astype(bool))
+    if len(mismatches):
+        i = mismatches[0]
+        raise ValueError(
+            f"Incorrect vested amount for {recipients[i]} in {escrow.address} "
+            f"- expected {expected[i]}, got {actual[i]} ({len(mismatches)} mismatches)"
+        )
+
+    print(f"{len(recipients)} balances verified in {escrow.address}")
@@ -0,0 +1,108 @@
+"""
+Vest tokens for historic LPs in a `VestingEscrowMerkle`.
+
+An alternative to `vest_lp_tokens`: rather than hundreds of `fund` transactions
+writing one balance per recipient, a single deployment commits to the Merkle
+root of every allocation. Recipients register with a proof when they first
+claim, which `serve` provides over HTTP.
+"""
+import json
+
+from brownie import ERC20CRV, VestingEscrowMerkle, accounts
+
+from . import deployment_config as config
+from .vest_lp_tokens import TOTAL_AMOUNT, VESTING_PERIOD, load_vested_amounts
+from .vesting_tree import VestingTree
+from .vesting_tree import serve as serve_proofs
+
+# allocations and root of the deployed tree, required to serve proofs
+TREE_JSON = "vesting-lp-tree.json"
+# number of recipients registered during the development sanity check
+SANITY_CHECK_SAMPLE = 10
+
+
+def live():
+    """
+    Vest tokens in a live environment.
+
+    * Build the Merkle tree and save it to `TREE_JSON`
+    * Deploy `VestingEscrowMerkle` and transfer the vested tokens to it
+    """
+    admin, _ = config.get_live_admin()
+
+    with open(config.DEPLOYMENTS_JSON) as fp:
+        deployments = json.load(fp)
+
+    vest_tokens(admin, deployments["ERC20CRV"], config.REQUIRED_CONFIRMATIONS)
+
+
+def development():
+    """
+    Vest tokens in a development environment.
+
+    * Deploy the DAO token
+    * Run the main deployment logic
+    * Perform a sanity check, registering a sample of recipients
+    """
+    token = ERC20CRV.deploy("Curve DAO Token", "CRV", 18, {"from": accounts[0]})
+    vesting_escrow, tree = vest_tokens(accounts[0], token, 1)
+    sanity_check(vesting_escrow, tree)
+
+
+def serve(host="127.0.0.1", port=8000):
+    """
+    Serve proofs for the tree saved in `TREE_JSON`.
+    """
+    serve_proofs(VestingTree.load(TREE_JSON), host, int(port))
+
+
+def vest_tokens(admin, token_address, confs):
+    token = ERC20CRV.at(token_address)
+
+    tree = VestingTree(dict(load_vested_amounts()))
+    if tree.total != TOTAL_AMOUNT:
+        raise ValueError(f"Tree total {tree.total} does not match {TOTAL_AMOUNT}")
+    # saved before deploying, so the root is never lost
+    tree.save(TREE_JSON)
+
+    start_time = token.future_epoch_time_write.call()
+    vesting_escrow = VestingEscrowMerkle.deploy(
+        token,
+        start_time,
+        start_time + VESTING_PERIOD,
+        False,
+        tree.root,
+        tree.total,
+        {"from": admin, "required_confs": confs},
+    )
+
+    token.approve(vesting_escrow, TOTAL_AMOUNT, {"from": admin, "required_confs": confs})
+    vesting_escrow.add_tokens(TOTAL_AMOUNT, {"from": admin, "required_confs": confs})
+
+    print(
+        f"VestingEscrowMerkle deployed at {vesting_escrow.address} for "
+        f"{len(tree.allocations)} recipients, tree saved to '{TREE_JSON}'"
+    )
+    return vesting_escrow, tree
+
+
+def sanity_check(vesting_address, tree):
+    vesting_escrow = VestingEscrowMerkle.at(vesting_address)
+    token = ERC20CRV.at(vesting_escrow.token())
+
+    if vesting_escrow.merkle_root() != tree.root:
+        raise ValueError(f"Unexpected Merkle root: {vesting_escrow.merkle_root()}")
+    if vesting_escrow.merkle_total() != TOTAL_AMOUNT:
+        raise ValueError(f"Unexpected Merkle total: {vesting_escrow.merkle_total()}")
+    if vesting_escrow.unallocated_supply() != TOTAL_AMOUNT:
+        raise ValueError(f"Unexpected funded supply: {vesting_escrow.unallocated_supply()}")
+    if token.balanceOf(vesting_escrow) != TOTAL_AMOUNT:
+        raise ValueError(f"Unexpected balance: {token.balanceOf(vesting_escrow)}")
+
+    for recipient in list(tree.allocations)[:SANITY_CHECK_SAMPLE]:
+        amount = tree.allocations[recipient]
+        vesting_escrow.register(recipient, amount, tree.proof(recipient), {"from": accounts[0]})
+        if vesting_escrow.initial_locked(recipient) != amount:
+            raise ValueError(f"Incorrect vested amount for {recipient}")
+
+    print("Sanity check passed!")
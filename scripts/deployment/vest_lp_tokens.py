@@ -1,13 +1,25 @@
 import json
+import os
 import threading
+import time
 from decimal import Decimal
 
-from brownie import ERC20CRV, VestingEscrow, accounts, history
+from brownie import ERC20CRV, VestingEscrow, accounts, chain, history, web3
+from web3.exceptions import TransactionNotFound
+
+from scripts.tx_runner import TxRunner
 
 from . import deployment_config as config
+from .allocation import allocate
+from .verify_vesting import verify_initial_locked
 
 TOTAL_AMOUNT = 151515151515151515151515151
 VESTING_PERIOD = 86400 * 365
+# append-only journal of every transaction sent, one JSON object per line. a new
+# run moves the journal of the previous run aside
+JOURNAL_PATH = "vesting-lp-log.jsonl"
+# pending `fund` transactions per funding admin
+FUNDS_IN_FLIGHT = 8
 
 # burn addresses / known scammers
 BLACKLIST = [
@@ -33,6 +45,23 @@ def live():
     vest_tokens(admin, funding_admins, deployments["ERC20CRV"], config.REQUIRED_CONFIRMATIONS)
 
 
+def resume_live():
+    """
+    Resume an interrupted distribution in a live environment.
+
+    * Read the journal to find the `VestingEscrow` deployment and pending txs
+    * Skip every step, and every `fund` batch, that already landed on-chain
+    """
+    admin, funding_admins = config.get_live_admin()
+
+    with open(config.DEPLOYMENTS_JSON) as fp:
+        deployments = json.load(fp)
+
+    vest_tokens(
+        admin, funding_admins, deployments["ERC20CRV"], config.REQUIRED_CONFIRMATIONS, resume=True
+    )
+
+
 def development():
     """
     Vest tokens in a development environment.
@@ -47,57 +76,105 @@ def development():
 
 
 logging_lock = threading.Lock()
-logger_data = []
+
+
+def _start_journal():
+    # keep the journal of a previous run, e.g. a development run before going live
+    if os.path.exists(JOURNAL_PATH) and os.path.getsize(JOURNAL_PATH):
+        root, ext = os.path.splitext(JOURNAL_PATH)
+        previous = f"{root}.{int(time.time())}{ext}"
+        os.replace(JOURNAL_PATH, previous)
+        print(f"Moved the journal of the previous run to '{previous}'")
 
 
 def _log_tx(**kwargs):
+    # one JSON object per line, appended and synced so the journal survives a crash
+    kwargs["chain_id"] = chain.id
     with logging_lock:
-        logger_data.append(kwargs)
-        with open("vesting-lp-log.json", "w") as fp:
-            json.dump(logger_data, fp)
+        with open(JOURNAL_PATH, "a") as fp:
+            fp.write(json.dumps(kwargs) + "\n")
+            fp.flush()
+            os.fsync(fp.fileno())
 
 
-def _fund_accounts(acct, vesting_escrow, fund_arguments, confs):
-    # called with 5 threads to fund recipients more efficiently
+def read_journal(path=JOURNAL_PATH):
+    """
+    Read the entries of a transaction journal, in the order they were written.
+    """
+    entries = []
+    with open(path) as fp:
+        for line in fp:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                # last line was cut short by a crash
+                break
+    return entries
+
+
+def _settle_pending(entries):
+    # wait for journaled txs still in the mempool, so they are not sent twice
+    for entry in entries:
+        try:
+            tx = web3.eth.get_transaction(entry["txid"])
+        except TransactionNotFound:
+            # dropped - whatever it did not do is redone on resume
+            continue
+        if tx["blockNumber"] is None:
+            print(f"Waiting for pending tx {entry['txid']}...")
+            web3.eth.wait_for_transaction_receipt(entry["txid"], timeout=3600)
+
+
+def _fund_accounts(acct, vesting_escrow, fund_arguments, confs, failures):
+    # called with one thread per funding admin. each admin pipelines its batches
+    # with local nonces, keeping up to `FUNDS_IN_FLIGHT` pending at once. errors
+    # are added to `failures`, as they would otherwise be lost with the thread
+    try:
+        _fund_batches(acct, vesting_escrow, fund_arguments, confs)
+    except Exception as exc:
+        failures.append(exc)
+        raise
+
+
+def _log_replacement(acct, batch, tx):
+    # fee bumps are journaled too, so resuming waits for the replacement
+    _log_tx(txid=tx.txid, fn_name=tx.fn_name, batch=batch, sender=acct.address)
+
+
+def _fund_batches(acct, vesting_escrow, fund_arguments, confs):
+    runner = TxRunner(
+        acct,
+        max_in_flight=FUNDS_IN_FLIGHT,
+        on_replace=lambda batch, tx: _log_replacement(acct, batch, tx),
+    )
     while fund_arguments:
         try:
-            recipients, amounts = fund_arguments.pop()
+            batch, recipients, amounts = fund_arguments.pop()
         except IndexError:
             break
-        tx = vesting_escrow.fund(recipients, amounts, {"from": acct, "required_confs": 0})
+        tx = runner.submit(batch, vesting_escrow.fund, recipients, amounts)
         _log_tx(
             txid=tx.txid,
             fn_name=tx.fn_name,
+            batch=batch,
             recipients=recipients,
             amounts=amounts,
             sender=acct.address,
         )
-        tx.wait(confs)
-
 
-def vest_tokens(admin, funding_admins, token_address, confs):
-    start_idx = len(history)
-
-    # get token Contract object
-    token = ERC20CRV.at(token_address)
+    for batch, tx in runner.wait().items():
+        if tx is None or tx.status != 1:
+            raise ValueError(f"Fund batch {batch} from {acct.address} failed")
+        tx.wait(confs)
 
-    # deploy vesting contract
-    start_time = token.future_epoch_time_write.call()
 
-    vesting_escrow = VestingEscrow.deploy(
-        token,
-        start_time,
-        start_time + VESTING_PERIOD,
-        False,
-        funding_admins,
-        {"from": admin, "required_confs": confs},
-    )
-    _log_tx(
-        txid=vesting_escrow.tx.txid,
-        fn_name="VestingEscrow.deploy",
-        contract_address=vesting_escrow.address,
-    )
+def load_vested_amounts():
+    """
+    Vested amount of each historic LP, as `[address, amount]` sorted by amount.
 
+    Amounts are allocated from `LP_VESTING_JSON` and sum exactly to `TOTAL_AMOUNT`.
+    Blacklisted addresses and zero amounts are left out.
+    """
     # load vesting data from json
     with open(config.LP_VESTING_JSON) as fp:
         vested_pct = {k.lower(): Decimal(v) for k, v in json.load(fp).items()}
@@ -106,55 +183,100 @@ def vest_tokens(admin, funding_admins, token_address, confs):
         if addr.lower() in vested_pct:
             del vested_pct[addr]
 
-    # calculate absolute amounts to be distributed
-    initial_total = sum(int(v * TOTAL_AMOUNT) for v in vested_pct.values())
-    adjustment_pct = Decimal(TOTAL_AMOUNT) / initial_total
+    # calculate absolute amounts to be distributed, summing exactly to TOTAL_AMOUNT
+    if min(vested_pct.values()) < 0:
+        raise ValueError(f"'{config.LP_VESTING_JSON}' contains negative amounts!")
+    amounts = allocate(TOTAL_AMOUNT, list(vested_pct.values()))
     vested_amounts = sorted(
-        ([k, int(v * TOTAL_AMOUNT * adjustment_pct)] for k, v in vested_pct.items()),
+        ([k, int(v)] for k, v in zip(vested_pct, amounts) if v),
         key=lambda k: k[1],
         reverse=True,
     )
 
-    if vested_amounts[-1][1] < 0:
-        raise ValueError(f"'{config.LP_VESTING_JSON}' contains negative amounts!")
+    return vested_amounts
 
-    vested_amounts = [i for i in vested_amounts if i[1]]
 
-    # floats -> int, we expect to be ever so slightly over, so lets fix that
-    final_total = sum(i[1] for i in vested_amounts)
+def vest_tokens(admin, funding_admins, token_address, confs, resume=False):
+    start_idx = len(history)
 
-    if not 0 < abs(final_total - TOTAL_AMOUNT) < len(vested_amounts):
-        raise ValueError("Imprecision!!! Distribution amounts are too far off!")
+    # get token Contract object
+    token = ERC20CRV.at(token_address)
 
-    for i in range(abs(final_total - TOTAL_AMOUNT)):
-        if final_total < TOTAL_AMOUNT:
-            vested_amounts[i][1] += 1
-        else:
-            vested_amounts[i][1] -= 1
+    if resume:
+        entries = read_journal()
+        if any(i.get("chain_id") != chain.id for i in entries):
+            raise ValueError(f"'{JOURNAL_PATH}' contains transactions from another chain")
+        _settle_pending([i for i in entries if "txid" in i])
+        deployment = next(i for i in entries[::-1] if i["fn_name"] == "VestingEscrow.deploy")
+        vesting_escrow = VestingEscrow.at(deployment["contract_address"])
+    else:
+        _start_journal()
+
+        # deploy vesting contract
+        start_time = token.future_epoch_time_write.call()
+
+        vesting_escrow = VestingEscrow.deploy(
+            token,
+            start_time,
+            start_time + VESTING_PERIOD,
+            False,
+            funding_admins,
+            {"from": admin, "required_confs": confs},
+        )
+        _log_tx(
+            txid=vesting_escrow.tx.txid,
+            fn_name="VestingEscrow.deploy",
+            contract_address=vesting_escrow.address,
+        )
+
+    vested_amounts = load_vested_amounts()
 
-    tx = token.approve(vesting_escrow, TOTAL_AMOUNT, {"from": admin, "required_confs": confs})
-    _log_tx(txid=tx.txid, fn_name=tx.fn_name, spender=vesting_escrow.address, amount=TOTAL_AMOUNT)
-    tx = vesting_escrow.add_tokens(TOTAL_AMOUNT, {"from": admin, "required_confs": confs})
-    _log_tx(txid=tx.txid, fn_name=tx.fn_name, amount=TOTAL_AMOUNT)
+    added = vesting_escrow.unallocated_supply() + vesting_escrow.initial_locked_supply()
+    if not resume or added < TOTAL_AMOUNT:
+        if not resume or token.allowance(admin, vesting_escrow) < TOTAL_AMOUNT:
+            tx = token.approve(
+                vesting_escrow, TOTAL_AMOUNT, {"from": admin, "required_confs": confs}
+            )
+            _log_tx(
+                txid=tx.txid,
+                fn_name=tx.fn_name,
+                spender=vesting_escrow.address,
+                amount=TOTAL_AMOUNT,
+            )
+        tx = vesting_escrow.add_tokens(TOTAL_AMOUNT, {"from": admin, "required_confs": confs})
+        _log_tx(txid=tx.txid, fn_name=tx.fn_name, amount=TOTAL_AMOUNT)
 
     # convert vested_amounts into input args for `VestingEscrow.fund` calls
     fund_arguments = [
-        ([x[0] for x in vested_amounts[i : i + 100]], [x[1] for x in vested_amounts[i : i + 100]])
+        (
+            i // 100,
+            [x[0] for x in vested_amounts[i : i + 100]],
+            [x[1] for x in vested_amounts[i : i + 100]],
+        )
         for i in range(0, len(vested_amounts), 100)
     ]
 
     # final call needs to be extended with zero values
-    zeros = 100 - len(fund_arguments[-1][0])
+    batch, recipients, amounts = fund_arguments[-1]
+    zeros = 100 - len(recipients)
     fund_arguments[-1] = (
-        fund_arguments[-1][0] + ["0x0000000000000000000000000000000000000000"] * zeros,
-        fund_arguments[-1][1] + [0] * zeros,
+        batch,
+        recipients + ["0x0000000000000000000000000000000000000000"] * zeros,
+        amounts + [0] * zeros,
     )
 
+    if resume:
+        # every recipient is funded once with a non-zero amount, so a batch
+        # has landed if its first recipient has a locked balance
+        fund_arguments = [i for i in fund_arguments if not vesting_escrow.initial_locked(i[1][0])]
+        print(f"Resuming with {len(fund_arguments)} fund batches remaining")
+
     # use threading to handle the funding across several accounts
     funding_threads = []
+    failures = []
     for acct in [admin] + funding_admins:
         thread = threading.Thread(
-            target=_fund_accounts, args=(acct, vesting_escrow, fund_arguments, confs)
+            target=_fund_accounts, args=(acct, vesting_escrow, fund_arguments, confs, failures)
         )
         funding_threads.append(thread)
         thread.start()
@@ -162,15 +284,25 @@ def vest_tokens(admin, funding_admins, token_address, confs):
     for thread in funding_threads:
         thread.join()
 
+    # the admin burn is irreversible, so stop here unless every recipient is funded
+    if failures:
+        raise ValueError(f"{len(failures)} funding admins failed") from failures[0]
+    recipients, expected = zip(*vested_amounts)
+    verify_initial_locked(vesting_escrow, recipients, expected)
+
     # burn all the admin accounts!
-    tx = vesting_escrow.disable_fund_admins({"from": admin, "required_confs": confs})
-    _log_tx(txid=tx.txid, fn_name=tx.fn_name)
-    vesting_escrow.commit_transfer_ownership(
-        "0x000000000000000000000000000000000000dead", {"from": admin, "required_confs": confs}
-    )
-    _log_tx(txid=tx.txid, fn_name=tx.fn_name)
-    vesting_escrow.apply_transfer_ownership({"from": admin, "required_confs": confs})
-    _log_tx(txid=tx.txid, fn_name=tx.fn_name)
+    dead = "0x000000000000000000000000000000000000dEaD"
+    if vesting_escrow.fund_admins_enabled():
+        tx = vesting_escrow.disable_fund_admins({"from": admin, "required_confs": confs})
+        _log_tx(txid=tx.txid, fn_name=tx.fn_name)
+    if vesting_escrow.admin() != dead:
+        if vesting_escrow.future_admin() != dead:
+            tx = vesting_escrow.commit_transfer_ownership(
+                dead, {"from": admin, "required_confs": confs}
+            )
+            _log_tx(txid=tx.txid, fn_name=tx.fn_name)
+        tx = vesting_escrow.apply_transfer_ownership({"from": admin, "required_confs": confs})
+        _log_tx(txid=tx.txid, fn_name=tx.fn_name)
 
     gas_used = sum(i.gas_used for i in history[start_idx:])
     print(f"Distribution complete! Total gas used: {gas_used}")
@@ -187,13 +319,7 @@ def sanity_check(vesting_address, vested_amounts):
     if vesting_escrow.unallocated_supply() != 0:
         raise ValueError(f"Unallocated supply remains: {vesting_escrow.unallocated_supply()}")
 
-    for count, (acct, expected) in enumerate(vested_amounts, start=1):
-        balance = vesting_escrow.initial_locked(acct)
-        if balance != expected:
-            raise ValueError(
-                f"Incorrect vested amount for {acct} - expected {expected}, got {balance}"
-            )
-        if not count % 250:
-            print(f"{count}/{len(vested_amounts)} balances verified...")
+    recipients, expected = zip(*vested_amounts)
+    verify_initial_locked(vesting_escrow, recipients, expected)
 
     print("Sanity check passed!")
@@ -2,7 +2,10 @@ import json
 
 from brownie import ERC20CRV, VestingEscrow, VestingEscrowFactory, VestingEscrowSimple, accounts
 
+from scripts.multicall import Multicall
+
 from . import deployment_config as config
+from .verify_vesting import verify_initial_locked
 
 ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 YEAR = 86400 * 365
@@ -90,6 +93,7 @@ def vest_tokens(admin, token_address, confs):
 
 
 def sanity_check(token, standard_escrows, factory_escrows):
+    multicall = Multicall()
 
     for factory, amount in factory_escrows:
         if token.balanceOf(factory) != amount:
@@ -107,12 +111,7 @@ def sanity_check(token, standard_escrows, factory_escrows):
                 f"Unallocated supply remains in {escrow.address}: {escrow.unallocated_supply()}"
             )
 
-        for recipient, expected in data["recipients"].items():
-            balance = escrow.initial_locked(recipient)
-            if balance != expected:
-                raise ValueError(
-                    f"Incorrect vested amount for {recipient} in {escrow.address} "
-                    f"- expected {expected}, got {balance}"
-                )
+        recipients, expected = zip(*data["recipients"].items())
+        verify_initial_locked(escrow, recipients, expected, multicall)
 
     print("Sanity check passed!")
@@ -0,0 +1,174 @@
+"""
+Merkle tree of vesting allocations for `VestingEscrowMerkle`, and a proof server.
+
+Instead of funding every recipient with `VestingEscrow.fund`, the deployer only
+commits to the root of a tree of `(recipient, amount)` leaves. Recipients later
+register with a proof, so deployment costs a single transaction regardless of
+the number of recipients.
+
+Pairs of nodes are sorted before hashing, so proofs do not need the position
+of the leaf. A node without a sibling is carried up to the next layer as is.
+Proofs are padded with empty nodes to `MAX_PROOF_LENGTH`, the fixed length the
+contract accepts.
+
+Only the allocations are saved to disk. The tree is rebuilt from them in a few
+seconds even for hundreds of thousands of recipients, and the proof server
+generates each proof on request.
+"""
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from eth_utils import keccak, to_checksum_address
+from hexbytes import HexBytes
+
+# `MAX_PROOF_LENGTH` in `VestingEscrowMerkle`
+MAX_PROOF_LENGTH = 32
+EMPTY_NODE = HexBytes(bytes(32))
+
+
+def leaf_hash(recipient, amount):
+    """
+    Leaf of an allocation, as computed by `VestingEscrowMerkle`.
+    """
+    recipient = HexBytes(str(recipient))
+    return keccak(recipient.rjust(32, b"\x00") + int(amount).to_bytes(32, "big"))
+
+
+def _hash_pair(a, b):
+    return keccak(a + b) if a <= b else keccak(b + a)
+
+
+class VestingTree:
+    """
+    Merkle tree over vesting allocations.
+
+    Arguments
+    ---------
+    allocations : dict
+        `{recipient: amount}`. Amounts of zero are left out of the tree.
+    """
+
+    def __init__(self, allocations):
+        self.allocations = {
+            to_checksum_address(str(k)): int(v) for k, v in allocations.items() if int(v)
+        }
+        if not self.allocations:
+            raise ValueError("No allocations")
+        self.total = sum(self.allocations.values())
+        self._index = {addr: i for i, addr in enumerate(self.allocations)}
+
+        self.layers = [[leaf_hash(k, v) for k, v in self.allocations.items()]]
+        while len(self.layers[-1]) > 1:
+            layer = self.layers[-1]
+            parents = [_hash_pair(layer[i], layer[i + 1]) for i in range(0, len(layer) - 1, 2)]
+            if len(layer) % 2:
+                parents.append(layer[-1])
+            self.layers.append(parents)
+
+        if len(self.layers) - 1 > MAX_PROOF_LENGTH:
+            raise ValueError(f"Tree is deeper than {MAX_PROOF_LENGTH} layers")
+
+    @property
+    def root(self):
+        """
+        Root of the tree, as given to `VestingEscrowMerkle` on deployment.
+        """
+        return HexBytes(self.layers[-1][0])
+
+    def proof(self, recipient):
+        """
+        Proof for the allocation of `recipient`, padded to `MAX_PROOF_LENGTH`.
+
+        Raises
+        ------
+        KeyError
+            If `recipient` has no allocation.
+        """
+        index = self._index[to_checksum_address(str(recipient))]
+        proof = []
+        for layer in self.layers[:-1]:
+            sibling = index ^ 1
+            if sibling < len(layer):
+                proof.append(HexBytes(layer[sibling]))
+            index //= 2
+
+        return proof + [EMPTY_NODE] * (MAX_PROOF_LENGTH - len(proof))
+
+    def claim(self, recipient):
+        """
+        Arguments for `VestingEscrowMerkle.register` for a recipient, as JSON.
+        """
+        recipient = to_checksum_address(str(recipient))
+        return {
+            "recipient": recipient,
+            "amount": str(self.allocations[recipient]),
+            "proof": [i.hex() for i in self.proof(recipient)],
+        }
+
+    def save(self, path):
+        """
+        Save the root and allocations as JSON, from which the tree can be rebuilt.
+        """
+        with open(path, "w") as fp:
+            json.dump(
+                {
+                    "merkle_root": self.root.hex(),
+                    "total": str(self.total),
+                    "allocations": {k: str(v) for k, v in self.allocations.items()},
+                },
+                fp,
+            )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Rebuild a tree saved with `save`.
+
+        Raises
+        ------
+        ValueError
+            If the rebuilt root does not match the saved root.
+        """
+        with open(path) as fp:
+            data = json.load(fp)
+        tree = cls(data["allocations"])
+        if tree.root != HexBytes(data["merkle_root"]):
+            raise ValueError(f"'{path}' does not match its Merkle root")
+        return tree
+
+
+def serve(tree, host="127.0.0.1", port=8000):
+    """
+    Serve claims over HTTP until interrupted.
+
+    `GET /<address>` returns the JSON output of `VestingTree.claim`, or 404 if the
+    address has no allocation. `GET /` returns the root and total amount.
+    """
+
+    class ProofHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            key = self.path.strip("/")
+            if not key:
+                body = {"merkle_root": tree.root.hex(), "total": str(tree.total)}
+            else:
+                try:
+                    body = tree.claim(key)
+                except (KeyError, ValueError):
+                    self.send_error(404, "No allocation")
+                    return
+
+            data = json.dumps(body).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    server = ThreadingHTTPServer((host, port), ProofHandler)
+    print(f"Serving proofs for {len(tree.allocations)} recipients at http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
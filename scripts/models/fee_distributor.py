@@ -0,0 +1,238 @@
+"""
+Offline model of `FeeDistributor`.
+
+A port of `_checkpoint_token`, `_checkpoint_total_supply` and `_claim`, built on
+top of `VotingEscrowModel`. `claimable_per_week` computes what every account is
+owed in every week as a single array operation, which is equivalent to calling
+`claim` repeatedly until `user_epoch_of` catches up with `user_point_epoch`.
+
+`_checkpoint_total_supply` in the contract also checkpoints the `VotingEscrow`.
+The model reads the same supply from the escrow model, which can differ by a few
+wei if the escrow was never checkpointed inside a week where the supply hit zero.
+"""
+from collections import defaultdict
+
+import numpy as np
+
+from .voting_escrow import Point, _key
+
+WEEK = 7 * 86400
+TOKEN_CHECKPOINT_DEADLINE = 86400
+# maximum number of weeks and user epochs iterated over in a single `claim`
+CLAIM_ITERATIONS = 50
+
+EMPTY_POINT = Point(0, 0, 0, 0)
+
+
+class FeeDistributorModel:
+    """
+    Python replica of `FeeDistributor`.
+
+    Arguments
+    ---------
+    voting_escrow : VotingEscrowModel
+        Model of the escrow the distributor reads balances from.
+    start_time : int
+        Epoch time for fee distribution to start.
+    """
+
+    def __init__(self, voting_escrow, start_time):
+        t = start_time // WEEK * WEEK
+        self.voting_escrow = voting_escrow
+        self.start_time = t
+        self.last_token_time = t
+        self.time_cursor = t
+        self.token_last_balance = 0
+        self.tokens_per_week = defaultdict(int)
+        self.ve_supply = defaultdict(int)
+        self.time_cursor_of = defaultdict(int)
+        self.user_epoch_of = defaultdict(int)
+
+    @classmethod
+    def from_contract(cls, distributor, voting_escrow):
+        """
+        Load the global state of a deployed `FeeDistributor`.
+
+        One `tokens_per_week` and one `ve_supply` read is made per week since
+        `start_time`. Per-account claim cursors are not loaded, so results assume
+        no account has claimed yet.
+        """
+        model = cls(voting_escrow, distributor.start_time())
+        model.last_token_time = distributor.last_token_time()
+        model.time_cursor = distributor.time_cursor()
+        model.token_last_balance = distributor.token_last_balance()
+
+        for week in range(model.start_time, model.last_token_time + WEEK, WEEK):
+            model.tokens_per_week[week] = distributor.tokens_per_week(week)
+        for week in range(model.start_time, model.time_cursor, WEEK):
+            model.ve_supply[week] = distributor.ve_supply(week)
+
+        return model
+
+    def checkpoint_token(self, token_balance, ts):
+        """
+        Apply `checkpoint_token` when the distributor holds `token_balance`.
+        """
+        to_distribute = token_balance - self.token_last_balance
+        self.token_last_balance = token_balance
+
+        t = self.last_token_time
+        since_last = ts - t
+        self.last_token_time = ts
+        this_week = t // WEEK * WEEK
+
+        for i in range(20):
+            next_week = this_week + WEEK
+            if ts < next_week:
+                if since_last == 0 and ts == t:
+                    self.tokens_per_week[this_week] += to_distribute
+                else:
+                    self.tokens_per_week[this_week] += to_distribute * (ts - t) // since_last
+                break
+            else:
+                if since_last == 0 and next_week == t:
+                    self.tokens_per_week[this_week] += to_distribute
+                else:
+                    self.tokens_per_week[this_week] += to_distribute * (next_week - t) // since_last
+            t = next_week
+            this_week = next_week
+
+    def checkpoint_total_supply(self, ts):
+        """
+        Apply `checkpoint_total_supply`.
+        """
+        t = self.time_cursor
+        rounded_timestamp = ts // WEEK * WEEK
+        weeks = list(range(t, rounded_timestamp + WEEK, WEEK))[:20]
+        for week, supply in zip(weeks, self.voting_escrow.total_supplies(weeks)):
+            self.ve_supply[week] = supply
+
+        self.time_cursor = t + WEEK * len(weeks)
+
+    def _claim(self, addr, _last_token_time):
+        history = self.voting_escrow.user_point_history.get(addr, [EMPTY_POINT])
+        max_user_epoch = len(history) - 1
+
+        if max_user_epoch == 0:
+            return (0, 0, 0, 0, False)
+
+        week_cursor = self.time_cursor_of[addr]
+        if week_cursor == 0:
+            user_epoch = 0
+            for user_epoch in range(max_user_epoch, -1, -1):
+                if history[user_epoch].ts <= self.start_time:
+                    break
+        else:
+            user_epoch = self.user_epoch_of[addr]
+
+        if user_epoch == 0:
+            user_epoch = 1
+
+        user_point = history[user_epoch]
+
+        if week_cursor == 0:
+            week_cursor = (user_point.ts + WEEK - 1) // WEEK * WEEK
+
+        if week_cursor >= _last_token_time:
+            return (0, 0, 0, 0, False)
+
+        week_cursor = max(week_cursor, self.start_time)
+        old_user_point = EMPTY_POINT
+        to_distribute = 0
+
+        for i in range(CLAIM_ITERATIONS):
+            if week_cursor >= _last_token_time:
+                break
+
+            if week_cursor >= user_point.ts and user_epoch <= max_user_epoch:
+                user_epoch += 1
+                old_user_point = user_point
+                if user_epoch > max_user_epoch:
+                    user_point = EMPTY_POINT
+                else:
+                    user_point = history[user_epoch]
+
+            else:
+                dt = week_cursor - old_user_point.ts
+                balance_of = max(old_user_point.bias - dt * old_user_point.slope, 0)
+                if balance_of == 0 and user_epoch > max_user_epoch:
+                    break
+                if balance_of > 0:
+                    to_distribute += (
+                        balance_of
+                        * self.tokens_per_week[week_cursor]
+                        // self.ve_supply[week_cursor]
+                    )
+
+                week_cursor += WEEK
+
+        user_epoch = min(max_user_epoch, user_epoch - 1)
+
+        return (to_distribute, user_epoch, week_cursor, max_user_epoch, True)
+
+    def claim(self, addr, ts, token_balance=None):
+        """
+        Apply a single `claim` call, including the iteration cap.
+
+        `token_balance` is the distributor balance at the time of the call. When
+        given, the token checkpoint that `claim` may trigger is also applied.
+
+        Returns
+        -------
+        tuple
+            (amount, claim_epoch, max_epoch) - the values logged in `Claimed`.
+        """
+        addr = _key(addr)
+        if ts >= self.time_cursor:
+            self.checkpoint_total_supply(ts)
+
+        last_token_time = self.last_token_time
+        if token_balance is not None and ts > last_token_time + TOKEN_CHECKPOINT_DEADLINE:
+            self.checkpoint_token(token_balance, ts)
+            last_token_time = ts
+
+        last_token_time = last_token_time // WEEK * WEEK
+        amount, user_epoch, week_cursor, max_user_epoch, is_update = self._claim(
+            addr, last_token_time
+        )
+
+        if is_update:
+            self.user_epoch_of[addr] = user_epoch
+            self.time_cursor_of[addr] = week_cursor
+
+        self.token_last_balance -= amount
+        return amount, user_epoch, max_user_epoch
+
+    def claimable_per_week(self, addrs, last_token_time=None):
+        """
+        Fees owed to each account in each distribution week.
+
+        Arguments
+        ---------
+        addrs : list
+            Account addresses.
+        last_token_time : int, optional
+            Distribute up to this time. Defaults to the last token checkpoint.
+
+        Returns
+        -------
+        ndarray
+            Week start times.
+        ndarray
+            Object array of shape `(len(addrs), len(weeks))`. Summing along axis 1
+            gives the total paid out by claiming until up-to-date.
+        """
+        if last_token_time is None:
+            last_token_time = self.last_token_time
+        weeks = np.arange(self.start_time, last_token_time // WEEK * WEEK, WEEK, dtype=np.int64)
+
+        balances = self.voting_escrow.balances(addrs, weeks)
+        tokens = np.array([self.tokens_per_week[i] for i in weeks], dtype=object)
+        supply = np.array([self.ve_supply[i] for i in weeks], dtype=object)
+
+        has_supply = (supply > 0).astype(bool)
+        amounts = balances * tokens // np.where(has_supply, supply, 1)
+
+        cursors = np.array([self.time_cursor_of[_key(i)] for i in addrs], dtype=np.int64)
+        unclaimed = weeks[None, :] >= cursors[:, None]
+        return weeks, np.where(unclaimed & has_supply, amounts, 0)
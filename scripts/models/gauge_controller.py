@@ -0,0 +1,492 @@
+"""
+Offline model of `GaugeController`.
+
+A line-for-line port of the weight bookkeeping in `GaugeController`
+(`points_weight`, `points_sum`, `changes_weight`, `changes_sum`, the type weights
+and the total), plus a vectorized projection that produces a gauges x weeks
+matrix of `gauge_relative_weight`.
+
+The projection steps every gauge and every type one week at a time as NumPy
+arrays, so hundreds of gauges can be forecast in a single pass. Values are what
+`gauge_relative_weight` returns once the weeks have been checkpointed. To
+evaluate a hypothetical vote, apply it to a `copy.deepcopy` of the model.
+"""
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+from .voting_escrow import EMPTY_LOCK, VotingEscrowModel, _key, fetch_logs
+
+WEEK = 7 * 86400
+WEIGHT_VOTE_DELAY = 10 * 86400
+MULTIPLIER = 10 ** 18
+
+Point = namedtuple("Point", "bias slope")
+VotedSlope = namedtuple("VotedSlope", "slope power end")
+
+EMPTY_POINT = Point(0, 0)
+EMPTY_SLOPE = VotedSlope(0, 0, 0)
+
+
+def _next_time(ts):
+    return (ts + WEEK) // WEEK * WEEK
+
+
+class GaugeControllerModel:
+    """
+    Python replica of `GaugeController` weight bookkeeping.
+
+    Every mutating method takes `ts`, the block timestamp of the call. Votes read
+    slopes and lock ends from `voting_escrow`, a `VotingEscrowModel` which must be
+    replayed up to the same point in time.
+    """
+
+    def __init__(self, start_ts=None, voting_escrow=None):
+        self.voting_escrow = voting_escrow or VotingEscrowModel()
+
+        self.n_gauge_types = 0
+        self.gauges = []
+        self.gauge_types_ = {}
+
+        self.vote_user_slopes = defaultdict(dict)
+        self.vote_user_power = defaultdict(int)
+        self.last_user_vote = defaultdict(dict)
+
+        self.points_weight = defaultdict(dict)
+        self.changes_weight = defaultdict(lambda: defaultdict(int))
+        self.time_weight = defaultdict(int)
+
+        self.points_sum = defaultdict(dict)
+        self.changes_sum = defaultdict(lambda: defaultdict(int))
+        self.time_sum = defaultdict(int)
+
+        self.points_total = defaultdict(int)
+        self.time_total = None if start_ts is None else start_ts // WEEK * WEEK
+
+        self.points_type_weight = defaultdict(lambda: defaultdict(int))
+        self.time_type_weight = defaultdict(int)
+
+    @classmethod
+    def from_contracts(cls, gauge_controller, voting_escrow, from_block=0, to_block="latest"):
+        """
+        Build a model by replaying the event history of a deployed `GaugeController`
+        and the `VotingEscrow` it reads from.
+        """
+        from brownie import web3
+
+        logs = fetch_logs(voting_escrow, ["Deposit", "Withdraw"], from_block, to_block)
+        logs += fetch_logs(
+            gauge_controller,
+            ["NewTypeWeight", "NewGauge", "NewGaugeWeight", "VoteForGauge"],
+            from_block,
+            to_block,
+        )
+        logs.sort(key=lambda k: (k["blockNumber"], k["logIndex"]))
+
+        model = cls()
+        for log in logs:
+            if log["event"] in ("Deposit", "Withdraw"):
+                model.voting_escrow.apply_logs([log])
+            else:
+                ts = None
+                if log["event"] == "NewGauge":
+                    ts = web3.eth.get_block(log["blockNumber"]).timestamp
+                model.apply_log(log, ts)
+
+        return model
+
+    def apply_log(self, log, ts=None):
+        """
+        Replay a single decoded `GaugeController` log.
+
+        `ts` is only required for `NewGauge`, which does not log a time.
+        """
+        args = log["args"]
+        if log["event"] == "NewTypeWeight":
+            # `add_type` only logs when the weight is non-zero, and logs it here first
+            self._ensure_type(args["type_id"])
+            self.change_type_weight(args["type_id"], args["weight"], args["time"] - WEEK)
+        elif log["event"] == "NewGauge":
+            self._ensure_type(args["gauge_type"])
+            self.add_gauge(args["addr"], args["gauge_type"], args["weight"], ts)
+        elif log["event"] == "NewGaugeWeight":
+            self.change_gauge_weight(args["gauge_address"], args["weight"], args["time"])
+        elif log["event"] == "VoteForGauge":
+            self.vote_for_gauge_weights(
+                args["user"], args["gauge_addr"], args["weight"], args["time"]
+            )
+
+    def _ensure_type(self, type_id):
+        self.n_gauge_types = max(self.n_gauge_types, type_id + 1)
+
+    def _init_time(self, ts):
+        if self.time_total is None:
+            self.time_total = ts // WEEK * WEEK
+
+    # internal fill loops
+
+    def _get_type_weight(self, gauge_type, ts):
+        t = self.time_type_weight[gauge_type]
+        if t > 0:
+            w = self.points_type_weight[gauge_type][t]
+            for i in range(500):
+                if t > ts:
+                    break
+                t += WEEK
+                self.points_type_weight[gauge_type][t] = w
+                if t > ts:
+                    self.time_type_weight[gauge_type] = t
+            return w
+        else:
+            return 0
+
+    @staticmethod
+    def _fill(points, changes, t, ts):
+        # shared body of `_get_sum` and `_get_weight`
+        bias, slope = points.get(t, EMPTY_POINT)
+        for i in range(500):
+            if t > ts:
+                break
+            t += WEEK
+            d_bias = slope * WEEK
+            if bias > d_bias:
+                bias -= d_bias
+                slope -= changes[t]
+            else:
+                bias = 0
+                slope = 0
+            points[t] = Point(bias, slope)
+        return bias, t
+
+    def _get_sum(self, gauge_type, ts):
+        t = self.time_sum[gauge_type]
+        if t > 0:
+            bias, t = self._fill(self.points_sum[gauge_type], self.changes_sum[gauge_type], t, ts)
+            if t > ts:
+                self.time_sum[gauge_type] = t
+            return bias
+        else:
+            return 0
+
+    def _get_weight(self, gauge_addr, ts):
+        t = self.time_weight[gauge_addr]
+        if t > 0:
+            bias, t = self._fill(
+                self.points_weight[gauge_addr], self.changes_weight[gauge_addr], t, ts
+            )
+            if t > ts:
+                self.time_weight[gauge_addr] = t
+            return bias
+        else:
+            return 0
+
+    def _get_total(self, ts):
+        t = self.time_total
+        if t > ts:
+            t -= WEEK
+        pt = self.points_total[t]
+
+        for gauge_type in range(self.n_gauge_types):
+            self._get_sum(gauge_type, ts)
+            self._get_type_weight(gauge_type, ts)
+
+        for i in range(500):
+            if t > ts:
+                break
+            t += WEEK
+            pt = 0
+            for gauge_type in range(self.n_gauge_types):
+                type_sum = self.points_sum[gauge_type].get(t, EMPTY_POINT).bias
+                pt += type_sum * self.points_type_weight[gauge_type][t]
+            self.points_total[t] = pt
+
+            if t > ts:
+                self.time_total = t
+        return pt
+
+    # state-changing methods
+
+    def add_type(self, weight, ts):
+        self._init_time(ts)
+        type_id = self.n_gauge_types
+        self.n_gauge_types = type_id + 1
+        if weight != 0:
+            self._change_type_weight(type_id, weight, ts)
+        return type_id
+
+    def change_type_weight(self, type_id, weight, ts):
+        self._init_time(ts)
+        self._change_type_weight(type_id, weight, ts)
+
+    def _change_type_weight(self, type_id, weight, ts):
+        old_weight = self._get_type_weight(type_id, ts)
+        old_sum = self._get_sum(type_id, ts)
+        _total_weight = self._get_total(ts)
+        next_time = _next_time(ts)
+
+        _total_weight = _total_weight + old_sum * weight - old_sum * old_weight
+        self.points_total[next_time] = _total_weight
+        self.points_type_weight[type_id][next_time] = weight
+        self.time_total = next_time
+        self.time_type_weight[type_id] = next_time
+
+    def add_gauge(self, addr, gauge_type, weight, ts):
+        self._init_time(ts)
+        addr = _key(addr)
+        if not 0 <= gauge_type < self.n_gauge_types:
+            raise ValueError(f"Unknown gauge type: {gauge_type}")
+        if addr in self.gauge_types_:
+            raise ValueError(f"Gauge already added: {addr}")
+
+        self.gauges.append(addr)
+        self.gauge_types_[addr] = gauge_type + 1
+        next_time = _next_time(ts)
+
+        if weight > 0:
+            _type_weight = self._get_type_weight(gauge_type, ts)
+            _old_sum = self._get_sum(gauge_type, ts)
+            _old_total = self._get_total(ts)
+
+            point = self.points_sum[gauge_type].get(next_time, EMPTY_POINT)
+            self.points_sum[gauge_type][next_time] = point._replace(bias=weight + _old_sum)
+            self.time_sum[gauge_type] = next_time
+            self.points_total[next_time] = _old_total + _type_weight * weight
+            self.time_total = next_time
+
+            point = self.points_weight[addr].get(next_time, EMPTY_POINT)
+            self.points_weight[addr][next_time] = point._replace(bias=weight)
+
+        if self.time_sum[gauge_type] == 0:
+            self.time_sum[gauge_type] = next_time
+        self.time_weight[addr] = next_time
+
+    def change_gauge_weight(self, addr, weight, ts):
+        self._init_time(ts)
+        addr = _key(addr)
+        gauge_type = self.gauge_types_[addr] - 1
+        old_gauge_weight = self._get_weight(addr, ts)
+        type_weight = self._get_type_weight(gauge_type, ts)
+        old_sum = self._get_sum(gauge_type, ts)
+        _total_weight = self._get_total(ts)
+        next_time = _next_time(ts)
+
+        point = self.points_weight[addr].get(next_time, EMPTY_POINT)
+        self.points_weight[addr][next_time] = point._replace(bias=weight)
+        self.time_weight[addr] = next_time
+
+        new_sum = old_sum + weight - old_gauge_weight
+        point = self.points_sum[gauge_type].get(next_time, EMPTY_POINT)
+        self.points_sum[gauge_type][next_time] = point._replace(bias=new_sum)
+        self.time_sum[gauge_type] = next_time
+
+        _total_weight = _total_weight + new_sum * type_weight - old_sum * type_weight
+        self.points_total[next_time] = _total_weight
+        self.time_total = next_time
+
+    def checkpoint(self, ts):
+        self._init_time(ts)
+        self._get_total(ts)
+
+    def checkpoint_gauge(self, addr, ts):
+        self._init_time(ts)
+        self._get_weight(_key(addr), ts)
+        self._get_total(ts)
+
+    def vote_for_gauge_weights(self, user, gauge_addr, user_weight, ts, slope=None, lock_end=None):
+        """
+        Apply `vote_for_gauge_weights`.
+
+        `slope` and `lock_end` default to the user's current values in `voting_escrow`.
+        Pass them explicitly to model a vote from a hypothetical account.
+        """
+        self._init_time(ts)
+        user, gauge_addr = _key(user), _key(gauge_addr)
+        if slope is None:
+            history = self.voting_escrow.user_point_history.get(user)
+            slope = history[-1].slope if history else 0
+        if lock_end is None:
+            lock_end = self.voting_escrow.locked.get(user, EMPTY_LOCK).end
+
+        next_time = _next_time(ts)
+        if lock_end <= next_time:
+            raise ValueError("Your token lock expires too soon")
+        if not 0 <= user_weight <= 10000:
+            raise ValueError("You used all your voting power")
+        if ts < self.last_user_vote[user].get(gauge_addr, 0) + WEIGHT_VOTE_DELAY:
+            raise ValueError("Cannot vote so often")
+        gauge_type = self.gauge_types_.get(gauge_addr, 0) - 1
+        if gauge_type < 0:
+            raise ValueError("Gauge not added")
+
+        old_slope = self.vote_user_slopes[user].get(gauge_addr, EMPTY_SLOPE)
+        old_dt = 0
+        if old_slope.end > next_time:
+            old_dt = old_slope.end - next_time
+        old_bias = old_slope.slope * old_dt
+        new_slope = VotedSlope(slope * user_weight // 10000, user_weight, lock_end)
+        new_bias = new_slope.slope * (lock_end - next_time)
+
+        power_used = self.vote_user_power[user] + new_slope.power - old_slope.power
+        if not 0 <= power_used <= 10000:
+            raise ValueError("Used too much power")
+        self.vote_user_power[user] = power_used
+
+        old_weight_bias = self._get_weight(gauge_addr, ts)
+        old_weight_slope = self.points_weight[gauge_addr].get(next_time, EMPTY_POINT).slope
+        old_sum_bias = self._get_sum(gauge_type, ts)
+        old_sum_slope = self.points_sum[gauge_type].get(next_time, EMPTY_POINT).slope
+
+        weight_bias = max(old_weight_bias + new_bias, old_bias) - old_bias
+        sum_bias = max(old_sum_bias + new_bias, old_bias) - old_bias
+        if old_slope.end > next_time:
+            weight_slope = (
+                max(old_weight_slope + new_slope.slope, old_slope.slope) - old_slope.slope
+            )
+            sum_slope = max(old_sum_slope + new_slope.slope, old_slope.slope) - old_slope.slope
+        else:
+            weight_slope = old_weight_slope + new_slope.slope
+            sum_slope = old_sum_slope + new_slope.slope
+        self.points_weight[gauge_addr][next_time] = Point(weight_bias, weight_slope)
+        self.points_sum[gauge_type][next_time] = Point(sum_bias, sum_slope)
+
+        if old_slope.end > ts:
+            self.changes_weight[gauge_addr][old_slope.end] -= old_slope.slope
+            self.changes_sum[gauge_type][old_slope.end] -= old_slope.slope
+        self.changes_weight[gauge_addr][new_slope.end] += new_slope.slope
+        self.changes_sum[gauge_type][new_slope.end] += new_slope.slope
+
+        self._get_total(ts)
+
+        self.vote_user_slopes[user][gauge_addr] = new_slope
+        self.last_user_vote[user][gauge_addr] = ts
+
+    # scalar views, matching the contract interface
+
+    def gauge_types(self, addr):
+        return self.gauge_types_[_key(addr)] - 1
+
+    def gauge_relative_weight(self, addr, time):
+        t = time // WEEK * WEEK
+        _total_weight = self.points_total.get(t, 0)
+        if _total_weight > 0:
+            gauge_type = self.gauge_types_[_key(addr)] - 1
+            _type_weight = self.points_type_weight[gauge_type].get(t, 0)
+            _gauge_weight = self.points_weight[_key(addr)].get(t, EMPTY_POINT).bias
+            return MULTIPLIER * _type_weight * _gauge_weight // _total_weight
+        else:
+            return 0
+
+    # vectorized projection
+
+    @staticmethod
+    def _project(rows, weeks):
+        # Bias of each `(points, changes, last_time)` row at each week, applying
+        # the `_get_weight` / `_get_sum` fill step to every row at once
+        grid, index = _grid(weeks)
+        result = np.zeros((len(rows), len(grid)), dtype=object)
+        last = np.array([i[2] for i in rows], dtype=np.int64)
+        bias = np.array([i[0].get(i[2], EMPTY_POINT).bias for i in rows], dtype=object)
+        slope = np.array([i[0].get(i[2], EMPTY_POINT).slope for i in rows], dtype=object)
+        columns = {w: i for i, w in enumerate(grid)}
+
+        for i, (points, _, t) in enumerate(rows):
+            for w in grid:
+                if w > t:
+                    break
+                result[i, columns[w]] = points.get(w, EMPTY_POINT).bias
+
+        started = last[last > 0]
+        if len(started) and len(grid):
+            for w in range(int(started.min()) + WEEK, grid[-1] + WEEK, WEEK):
+                active = (last > 0) & (w > last)
+                if not active.any():
+                    continue
+                d_bias = slope * WEEK
+                keep = active & (bias > d_bias).astype(bool)
+                d_slope = np.array([i[1].get(w, 0) for i in rows], dtype=object)
+                bias = np.where(keep, bias - d_bias, np.where(active, 0, bias))
+                slope = np.where(keep, slope - d_slope, np.where(active, 0, slope))
+                if w in columns:
+                    result[active, columns[w]] = bias[active]
+
+        return result[:, index]
+
+    def gauge_weights(self, weeks, gauges=None):
+        """
+        Absolute weight of each gauge at the start of each week.
+
+        Returns an object array of shape `(len(gauges), len(weeks))`.
+        """
+        gauges = self.gauges if gauges is None else [_key(i) for i in gauges]
+        rows = [
+            (self.points_weight[i], self.changes_weight[i], self.time_weight[i]) for i in gauges
+        ]
+        return self._project(rows, weeks)
+
+    def type_sums(self, weeks):
+        """
+        Sum of gauge weights per type at the start of each week.
+        """
+        types = range(self.n_gauge_types)
+        rows = [(self.points_sum[i], self.changes_sum[i], self.time_sum[i]) for i in types]
+        return self._project(rows, weeks)
+
+    def type_weights(self, weeks):
+        """
+        Weight of each type at the start of each week.
+        """
+        weeks = [int(i) // WEEK * WEEK for i in weeks]
+        result = np.zeros((self.n_gauge_types, len(weeks)), dtype=object)
+        for type_id in range(self.n_gauge_types):
+            t = self.time_type_weight[type_id]
+            if t == 0:
+                continue
+            points = self.points_type_weight[type_id]
+            for i, w in enumerate(weeks):
+                result[type_id, i] = points.get(w, 0) if w <= t else points[t]
+        return result
+
+    def total_weights(self, weeks):
+        """
+        Total type-weighted gauge weight at the start of each week.
+        """
+        weeks = [int(i) // WEEK * WEEK for i in weeks]
+        projected = np.zeros(len(weeks), dtype=object)
+        projected += (self.type_sums(weeks) * self.type_weights(weeks)).sum(axis=0)
+        stored = np.array([self.points_total.get(w, 0) for w in weeks], dtype=object)
+        return np.where(np.array(weeks) <= (self.time_total or 0), stored, projected)
+
+    def gauge_relative_weights(self, weeks, gauges=None):
+        """
+        `gauge_relative_weight` of each gauge at the start of each week.
+
+        Arguments
+        ---------
+        weeks : list
+            Timestamps to query, rounded down to whole weeks.
+        gauges : list, optional
+            Gauge addresses. Defaults to every gauge, in the order they were added.
+
+        Returns
+        -------
+        ndarray
+            Object array of shape `(len(gauges), len(weeks))`, normalized to 1e18.
+        """
+        gauges = self.gauges if gauges is None else [_key(i) for i in gauges]
+        type_ids = [self.gauge_types_[i] - 1 for i in gauges]
+
+        gauge_weights = self.gauge_weights(weeks, gauges)
+        type_weights = self.type_weights(weeks)[type_ids]
+        total = self.total_weights(weeks)
+
+        has_total = (total > 0).astype(bool)
+        relative = MULTIPLIER * type_weights * gauge_weights // np.where(has_total, total, 1)
+        return np.where(has_total, relative, 0)
+
+
+def _grid(weeks):
+    # sorted unique week starts, and the position of each input within them
+    weeks = [int(i) // WEEK * WEEK for i in weeks]
+    grid = sorted(set(weeks))
+    position = {w: i for i, w in enumerate(grid)}
+    return grid, [position[w] for w in weeks]
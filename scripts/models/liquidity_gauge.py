@@ -0,0 +1,91 @@
+"""
+Vectorized boost math of `LiquidityGaugeV5`.
+
+`working_balances` is a port of `_update_liquidity_limit` that accepts arrays, so
+the working balance of every depositor in every gauge can be evaluated at once.
+Inputs broadcast against each other with NumPy rules, e.g. `balances` of shape
+`(gauges, users)`, `total_supplies` of shape `(gauges, 1)`, `voting_balances` of
+shape `(users,)` and a scalar `voting_total`.
+
+`voting_balances` follow `DelegationProxy.adjusted_balance_of`: the veRBN
+balance, unless a boost delegation contract is set. `VotingEscrowModel.balances`
+gives the former for many accounts in one call.
+"""
+import numpy as np
+
+TOKENLESS_PRODUCTION = 40
+# boost of a working balance at its cap, relative to an unboosted deposit
+MAX_BOOST = 100 / TOKENLESS_PRODUCTION
+
+
+def _where_positive(values, dtype):
+    values = np.asarray(values, dtype=dtype)
+    return (values > 0).astype(bool), np.where((values > 0).astype(bool), values, 1)
+
+
+def working_balances(balances, total_supplies, voting_balances, voting_total, dtype=object):
+    """
+    Working balance of each depositor, as set by `_update_liquidity_limit`.
+
+    Arguments
+    ---------
+    balances : array_like
+        LP balance of each depositor (`l`).
+    total_supplies : array_like
+        Total LP deposited in the gauge (`L`).
+    voting_balances : array_like
+        Adjusted veRBN balance of each depositor.
+    voting_total : array_like
+        veRBN `totalSupply`.
+    dtype : type
+        `object` for exact integers, `float` for fast approximate values.
+
+    Returns
+    -------
+    ndarray
+        Working balances, broadcast to the shape of the inputs.
+    """
+    balance = np.asarray(balances, dtype=dtype)
+    supply = np.asarray(total_supplies, dtype=dtype)
+    has_total, total = _where_positive(voting_total, dtype)
+
+    lim = balance * TOKENLESS_PRODUCTION // 100
+    boost = supply * np.asarray(voting_balances, dtype=dtype) // total
+    lim = lim + np.where(has_total, boost * (100 - TOKENLESS_PRODUCTION) // 100, 0)
+
+    return np.minimum(balance, lim)
+
+
+def working_supply(working_supply, old_working_balances, new_working_balances):
+    """
+    `working_supply` after updating every depositor along the last axis.
+    """
+    new = np.asarray(new_working_balances, dtype=object)
+    old = np.asarray(old_working_balances, dtype=object)
+    return working_supply + (new - old).sum(axis=-1)
+
+
+def boosts(balances, working_balances):
+    """
+    Boost factor of each depositor, between 1 and `MAX_BOOST`.
+
+    Depositors with no LP balance have a boost of 0.
+    """
+    has_balance, balance = _where_positive(balances, float)
+    working = np.asarray(working_balances, dtype=float)
+    return np.where(has_balance, working * 100 / TOKENLESS_PRODUCTION / balance, 0.0)
+
+
+def max_boost_voting_balances(balances, total_supplies, voting_total, dtype=object):
+    """
+    Smallest adjusted veRBN balance giving each depositor `MAX_BOOST`, i.e. a
+    working balance equal to their LP balance. Includes the contract's rounding.
+    """
+    balance = np.asarray(balances, dtype=dtype)
+    has_supply, supply = _where_positive(total_supplies, dtype)
+
+    # `L * voting_balance / voting_total * 60 / 100` must cover the unboosted remainder
+    remainder = balance - balance * TOKENLESS_PRODUCTION // 100
+    share = -(-remainder * 100 // (100 - TOKENLESS_PRODUCTION))
+    required = -(-share * np.asarray(voting_total, dtype=dtype) // supply)
+    return np.where(has_supply, required, 0)
@@ -0,0 +1,271 @@
+"""
+Offline models of the emission schedules in `Minter` and `ERC20CRV`.
+
+Both contracts emit at a constant `rate` per mining epoch of `RATE_REDUCTION_TIME`
+seconds, and change the rate in `_update_mining_parameters`:
+
+* `Minter` starts at `INITIAL_RATE` and afterwards only changes to a rate
+  committed through `commit_next_emission`.
+* `ERC20CRV` reduces the rate by `RATE_REDUCTION_COEFFICIENT` every epoch.
+
+The models replay `_update_mining_parameters` once per epoch, and cache the
+result as an `EmissionSchedule` that evaluates cumulative supply for whole
+arrays of timestamps. Projections assume `_update_mining_parameters` is called
+on time, i.e. they give the theoretical supply curve.
+"""
+import copy
+from abc import ABC, abstractmethod
+from itertools import accumulate
+
+import numpy as np
+
+from .voting_escrow import fetch_logs
+
+WEEK = 86400 * 7
+YEAR = 86400 * 365
+MAX_UINT256 = 2 ** 256 - 1
+
+
+class EmissionSchedule:
+    """
+    Cumulative supply of a constant-rate-per-epoch emission.
+
+    Arguments
+    ---------
+    start_time : int
+        Start of mining epoch 0.
+    epoch_length : int
+        Length of a mining epoch, in seconds.
+    rates : list
+        Emission rate per second for each epoch. The last rate is assumed to
+        continue indefinitely.
+    start_supply : int
+        Supply before epoch 0.
+    """
+
+    def __init__(self, start_time, epoch_length, rates, start_supply=0):
+        self.start_time = start_time
+        self.epoch_length = epoch_length
+        # index 0 holds the period before emission starts, index `i + 1` epoch `i`
+        self.rates = np.array([0] + list(rates), dtype=object)
+        self.epoch_supply = np.array(
+            [start_supply]
+            + [start_supply + i * epoch_length for i in accumulate([0] + list(rates[:-1]))],
+            dtype=object,
+        )
+
+    def epoch_at(self, timestamps):
+        """
+        Mining epoch at each timestamp, `-1` before emission starts.
+        """
+        t = np.asarray(timestamps, dtype=np.int64)
+        epochs = (t - self.start_time) // self.epoch_length
+        return epochs.clip(-1, len(self.rates) - 2)
+
+    def supply_at(self, timestamps, dtype=object):
+        """
+        Cumulative supply at each timestamp.
+
+        Arguments
+        ---------
+        timestamps : array_like
+            Epoch times to query.
+        dtype : type
+            `object` for exact integers, `float` for fast approximate values.
+
+        Returns
+        -------
+        ndarray
+            Array of shape `(len(timestamps),)`.
+        """
+        t = np.asarray(timestamps, dtype=np.int64)
+        idx = self.epoch_at(t) + 1
+        start = np.maximum(self.start_time + (idx - 1) * self.epoch_length, self.start_time)
+        supply = self.epoch_supply[idx] + self.rates[idx] * (t - start).astype(object)
+        return supply.astype(dtype)
+
+    def mintable_in_timeframe(self, starts, ends, dtype=object):
+        """
+        Supply emitted between each pair of `starts` and `ends`.
+        """
+        return self.supply_at(ends, dtype) - self.supply_at(starts, dtype)
+
+
+class _EmissionModel(ABC):
+    RATE_REDUCTION_TIME = 0
+    start_supply = 0
+
+    def __init__(self, start_epoch_time, mining_epoch=-1):
+        self.start_epoch_time = start_epoch_time
+        self.mining_epoch = mining_epoch
+        self.rate = 0
+        # rate for each mining epoch since epoch 0
+        self.rates = []
+        self._schedule = None
+        self._schedule_end = 0
+
+    @abstractmethod
+    def _update_mining_parameters(self):
+        """
+        Advance `start_epoch_time` and `mining_epoch` by one epoch, and append the
+        new `rate` to `rates`.
+        """
+
+    def update_mining_parameters(self, ts):
+        """
+        Apply `update_mining_parameters` at `ts`.
+        """
+        if ts < self.start_epoch_time + self.RATE_REDUCTION_TIME:
+            raise ValueError("too soon!")
+        self._update_mining_parameters()
+
+    def schedule(self, timestamp):
+        """
+        Emission schedule covering every epoch up to `timestamp`.
+
+        Epochs after `mining_epoch` are projected by applying
+        `_update_mining_parameters` at the start of each one.
+        """
+        if self._schedule is None or timestamp >= self._schedule_end:
+            model = copy.copy(self)
+            model.rates = list(self.rates)
+            while model.start_epoch_time + model.RATE_REDUCTION_TIME <= timestamp:
+                model._update_mining_parameters()
+            self._schedule = EmissionSchedule(
+                self.start_epoch_time - self.mining_epoch * self.RATE_REDUCTION_TIME,
+                self.RATE_REDUCTION_TIME,
+                model.rates,
+                self.start_supply,
+            )
+            self._schedule_end = model.start_epoch_time + model.RATE_REDUCTION_TIME
+        return self._schedule
+
+    def supply_at(self, timestamps, dtype=object):
+        """
+        Theoretical cumulative supply at each timestamp.
+        """
+        return self.schedule(max(timestamps)).supply_at(timestamps, dtype)
+
+    def mintable_in_timeframe(self, starts, ends, dtype=object):
+        """
+        Theoretical supply emitted between each pair of `starts` and `ends`.
+        """
+        return self.schedule(max(ends)).mintable_in_timeframe(starts, ends, dtype)
+
+
+class MinterModel(_EmissionModel):
+    """
+    Python replica of the `Minter` emission parameters.
+
+    Arguments
+    ---------
+    start_epoch_time : int
+        `start_epoch_time` of the minter.
+    mining_epoch : int
+        `mining_epoch` of the minter. `rates` must be filled in for every epoch
+        up to this one.
+    """
+
+    INITIAL_RATE = 250_000 * 10 ** 18 // WEEK
+    MAX_ABS_RATE = 10_000_000 * 10 ** 18
+    RATE_REDUCTION_TIME = WEEK * 2
+
+    def __init__(self, start_epoch_time, mining_epoch=-1):
+        super().__init__(start_epoch_time, mining_epoch)
+        self.committed_rate = MAX_UINT256
+        self.is_start = True
+
+    @classmethod
+    def from_contract(cls, minter, from_block=0, to_block="latest"):
+        """
+        Load a deployed `Minter`.
+
+        Past rates are read from `UpdateMiningParameters` logs, so `from_block`
+        must be no later than the minter deployment.
+        """
+        logs = fetch_logs(minter, ["UpdateMiningParameters"], from_block, to_block)
+
+        model = cls(
+            minter.start_epoch_time(block_identifier=to_block),
+            minter.mining_epoch(block_identifier=to_block),
+        )
+        model.rate = minter.rate(block_identifier=to_block)
+        model.committed_rate = minter.committed_rate(block_identifier=to_block)
+        model.is_start = minter.is_start(block_identifier=to_block)
+        model.rates = [log["args"]["rate"] for log in logs]
+        return model
+
+    def _update_mining_parameters(self):
+        _rate = self.rate
+
+        self.start_epoch_time += self.RATE_REDUCTION_TIME
+        self.mining_epoch += 1
+
+        if _rate == 0 and self.is_start:
+            _rate = self.INITIAL_RATE
+            self.is_start = False
+        elif self.committed_rate != MAX_UINT256:
+            _rate = self.committed_rate
+            self.committed_rate = MAX_UINT256
+
+        self.rate = _rate
+        self.rates.append(_rate)
+        self._schedule = None
+
+    def commit_next_emission(self, rate_per_week):
+        """
+        Apply `commit_next_emission`.
+        """
+        if rate_per_week > self.MAX_ABS_RATE:
+            raise ValueError("preventing fatfinger")
+        self.committed_rate = rate_per_week // WEEK
+        self._schedule = None
+
+
+class ERC20CRVModel(_EmissionModel):
+    """
+    Python replica of the `ERC20CRV` emission parameters.
+
+    Arguments
+    ---------
+    start_epoch_time : int
+        `start_epoch_time` of the token.
+    mining_epoch : int
+        `mining_epoch` of the token.
+    """
+
+    INITIAL_SUPPLY = 1_303_030_303 * 10 ** 18
+    INITIAL_RATE = 274_815_283 * 10 ** 18 // YEAR
+    RATE_REDUCTION_TIME = YEAR
+    RATE_REDUCTION_COEFFICIENT = 1189207115002721024
+    RATE_DENOMINATOR = 10 ** 18
+
+    start_supply = INITIAL_SUPPLY
+
+    def __init__(self, start_epoch_time, mining_epoch=-1):
+        # the schedule is fixed, so replay every epoch since deployment
+        super().__init__(start_epoch_time - (mining_epoch + 1) * self.RATE_REDUCTION_TIME)
+        for i in range(mining_epoch + 1):
+            self._update_mining_parameters()
+
+    @classmethod
+    def from_contract(cls, token, block_identifier="latest"):
+        """
+        Load a deployed `ERC20CRV`.
+        """
+        return cls(
+            token.start_epoch_time(block_identifier=block_identifier),
+            token.mining_epoch(block_identifier=block_identifier),
+        )
+
+    def _update_mining_parameters(self):
+        self.start_epoch_time += self.RATE_REDUCTION_TIME
+        self.mining_epoch += 1
+
+        if self.rate == 0:
+            self.rate = self.INITIAL_RATE
+        else:
+            self.rate = self.rate * self.RATE_DENOMINATOR // self.RATE_REDUCTION_COEFFICIENT
+
+        self.rates.append(self.rate)
+        self._schedule = None
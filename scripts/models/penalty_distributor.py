@@ -0,0 +1,186 @@
+"""
+Offline model of `PenaltyDistributor`.
+
+`PenaltyDistributor` shares its checkpoint and claim logic with `FeeDistributor`.
+It is funded by the penalties `VotingEscrow.force_withdraw` donates, and by
+anyone else calling `donate`.
+
+The model is rebuilt from indexed events only:
+
+* `Deposit` / `Withdraw` / `FundsUnlocked` from the escrow. A `Withdraw` before
+  the lock end while funds are locked is a `force_withdraw`, and its penalty is
+  recomputed from the lock.
+* `CheckpointToken` / `Claimed` from the distributor.
+
+`claimable` then gives every holder's outstanding rewards as one array operation,
+instead of calling `claimable(addr)` once per holder.
+"""
+from .fee_distributor import TOKEN_CHECKPOINT_DEADLINE, WEEK, FeeDistributorModel
+from .voting_escrow import MAXTIME, MULTIPLIER, VotingEscrowModel, _key, fetch_logs
+
+MAX_PENALTY_RATIO = MULTIPLIER * 3 // 4
+
+
+def penalty_ratio(time_left):
+    """
+    Fraction of a lock paid as penalty by `force_withdraw`, scaled by `MULTIPLIER`.
+    """
+    return min(MAX_PENALTY_RATIO, MULTIPLIER * time_left // MAXTIME)
+
+
+class PenaltyDistributorModel(FeeDistributorModel):
+    """
+    Python replica of `PenaltyDistributor`.
+
+    Arguments
+    ---------
+    voting_escrow : VotingEscrowModel
+        Model of the escrow the distributor reads balances from.
+    start_time : int
+        Epoch time for reward distribution to start.
+    """
+
+    def __init__(self, voting_escrow, start_time):
+        super().__init__(voting_escrow, start_time)
+        self.token_balance = 0
+        self.is_unlocked = False
+        # (timestamp, account, amount) for every `force_withdraw` penalty
+        self.penalties = []
+
+    @classmethod
+    def from_contracts(cls, distributor, voting_escrow, from_block=0, to_block="latest"):
+        """
+        Build a model by replaying the event history of a deployed `PenaltyDistributor`
+        and the `VotingEscrow` that donates to it.
+
+        Donations made directly through `donate` are not logged. They are picked up
+        at the next `CheckpointToken`, so `token_balance` only includes penalties
+        donated since then. `checkpoint_total_supply` is not logged either, so
+        `ve_supply` is filled in up to the distributor's `time_cursor` at `to_block`.
+        """
+        from brownie import web3
+
+        logs = fetch_logs(
+            voting_escrow, ["Deposit", "Withdraw", "FundsUnlocked"], from_block, to_block
+        )
+        logs += fetch_logs(distributor, ["CheckpointToken", "Claimed"], from_block, to_block)
+        logs.sort(key=lambda k: (k["blockNumber"], k["logIndex"]))
+
+        model = cls(VotingEscrowModel(), distributor.start_time())
+        checkpoint_tx = None
+        for log in logs:
+            args = log["args"]
+            if log["event"] == "Deposit":
+                model.voting_escrow.apply_logs([log])
+            elif log["event"] == "Withdraw":
+                penalty = model.withdraw(
+                    args["provider"], args["ts"], log["blockNumber"], donate=False
+                )
+                # `donate` logs `CheckpointToken` before `Withdraw` when it checkpoints
+                if log["transactionHash"] != checkpoint_tx:
+                    model.token_balance += penalty
+            elif log["event"] == "FundsUnlocked":
+                model.is_unlocked = args["funds_unlocked"]
+            elif log["event"] == "CheckpointToken":
+                checkpoint_tx = log["transactionHash"]
+                model.checkpoint_token(model.token_last_balance + args["tokens"], args["time"])
+            elif log["event"] == "Claimed":
+                ts = web3.eth.get_block(log["blockNumber"]).timestamp
+                model._apply_claimed(args["recipient"], args["amount"], args["claim_epoch"], ts)
+
+        time_cursor = distributor.time_cursor(block_identifier=to_block)
+        while model.time_cursor < time_cursor:
+            model.checkpoint_total_supply(time_cursor - WEEK)
+
+        return model
+
+    def _apply_claimed(self, addr, amount, claim_epoch, ts):
+        # `Claimed` does not log the week cursor, so it is recomputed
+        addr = _key(addr)
+        if ts >= self.time_cursor:
+            self.checkpoint_total_supply(ts)
+        week_cursor = self._claim(addr, self.last_token_time // WEEK * WEEK)[2]
+        self.user_epoch_of[addr] = claim_epoch
+        self.time_cursor_of[addr] = week_cursor
+        self.token_last_balance -= amount
+        self.token_balance -= amount
+
+    def checkpoint_token(self, token_balance, ts):
+        self.token_balance = token_balance
+        super().checkpoint_token(token_balance, ts)
+
+    def donate(self, amount, ts):
+        """
+        Apply `donate`, including the token checkpoint it may trigger.
+        """
+        if amount == 0:
+            raise ValueError("Cannot donate zero")
+        self.token_balance += amount
+        if ts > self.last_token_time + TOKEN_CHECKPOINT_DEADLINE:
+            self.checkpoint_token(self.token_balance, ts)
+
+    def penalty(self, addr, ts):
+        """
+        Penalty `addr` would pay by calling `force_withdraw` at `ts`.
+        """
+        locked = self.voting_escrow.locked.get(_key(addr))
+        if locked is None or locked.end <= ts or self.is_unlocked:
+            return 0
+        return locked.amount * penalty_ratio(locked.end - ts) // MULTIPLIER
+
+    def withdraw(self, addr, ts, blk, donate=True):
+        """
+        Apply `withdraw` or `force_withdraw` on the escrow.
+
+        A withdrawal before the lock end is a `force_withdraw`, and its penalty is
+        recorded and donated to the distributor. With `donate=False` the penalty is
+        only recorded, for replaying logs where the donation is accounted for
+        separately.
+
+        Returns
+        -------
+        int
+            The penalty paid.
+        """
+        penalty = self.penalty(addr, ts)
+        self.voting_escrow.withdraw(addr, ts, blk)
+        if penalty:
+            self.penalties.append((ts, _key(addr), penalty))
+            if donate:
+                self.donate(penalty, ts)
+        return penalty
+
+    def claim(self, addr, ts):
+        """
+        Apply a single `claim` call, including the iteration cap and the token
+        checkpoint it may trigger.
+
+        Returns
+        -------
+        tuple
+            (amount, claim_epoch, max_epoch) - the values logged in `Claimed`.
+        """
+        result = super().claim(addr, ts, self.token_balance)
+        self.token_balance -= result[0]
+        return result
+
+    def claimable(self, addrs, last_token_time=None):
+        """
+        Outstanding rewards for each account.
+
+        Unlike the contract's `claimable`, this is not limited to 50 weeks per
+        call - it is the total paid out by claiming until up-to-date.
+
+        Arguments
+        ---------
+        addrs : list
+            Account addresses.
+        last_token_time : int, optional
+            Distribute up to this time. Defaults to the last token checkpoint.
+
+        Returns
+        -------
+        ndarray
+            Object array of shape `(len(addrs),)`.
+        """
+        return self.claimable_per_week(addrs, last_token_time)[1].sum(axis=1)
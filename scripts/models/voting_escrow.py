@@ -0,0 +1,381 @@
+"""
+Offline model of `VotingEscrow`.
+
+Replays `Deposit` and `Withdraw` events through a line-for-line port of
+`VotingEscrow._checkpoint`, and answers `balanceOf` / `totalSupply` /
+`totalSupplyAt` for many accounts and timestamps at once using NumPy.
+
+Integer results are exact by default (`dtype=object`). Pass `dtype=float` to the
+bulk query methods for a much faster, approximate answer.
+
+Standalone `VotingEscrow.checkpoint()` calls do not emit an event, so they are not
+replayed. These calls only affect the interpolated block numbers of global points,
+which can move results of `total_supply_at` by a few wei.
+"""
+from collections import defaultdict, namedtuple
+
+import numpy as np
+
+WEEK = 7 * 86400
+MAXTIME = 2 * 365 * 86400
+MULTIPLIER = 10 ** 18
+
+Point = namedtuple("Point", "bias slope ts blk")
+LockedBalance = namedtuple("LockedBalance", "amount end")
+
+EMPTY_LOCK = LockedBalance(0, 0)
+
+# user points are located using a single sorted key of `(user index << 40) | ts`
+_TS_BITS = 40
+
+
+def _key(addr):
+    return str(addr).lower()
+
+
+def fetch_logs(contract, event_names, from_block=0, to_block="latest", step=100000):
+    """
+    Fetch decoded logs for one or more events, in chain order.
+
+    Arguments
+    ---------
+    contract : Contract
+        Brownie contract object to fetch logs for.
+    event_names : list
+        Names of the events to fetch.
+    from_block : int
+        First block to query.
+    to_block : int | str
+        Last block to query.
+    step : int
+        Maximum number of blocks to request per `eth_getLogs` call.
+
+    Returns
+    -------
+    list
+        Decoded web3 logs, sorted by `(blockNumber, logIndex)`.
+    """
+    from brownie import web3
+
+    if to_block == "latest":
+        to_block = web3.eth.block_number
+
+    w3_contract = web3.eth.contract(str(contract), abi=contract.abi)
+    logs = []
+    for start in range(from_block, to_block + 1, step):
+        end = min(start + step - 1, to_block)
+        for name in event_names:
+            logs += w3_contract.events[name].getLogs(fromBlock=start, toBlock=end)
+
+    return sorted(logs, key=lambda k: (k["blockNumber"], k["logIndex"]))
+
+
+class VotingEscrowModel:
+    """
+    Python replica of `VotingEscrow` point history.
+
+    State variables use the same names as the contract. `point_history` is a list
+    indexed by epoch, `user_point_history` maps a lowercased address to a list
+    indexed by user epoch (index 0 is always an empty point).
+
+    `maxtime` is the escrow's maximum lock time. It defaults to `MAXTIME` of the
+    Ribbon `VotingEscrow`. Curve's veCRV locks for up to four years.
+    """
+
+    def __init__(self, start_ts=0, start_block=0, maxtime=MAXTIME):
+        self.maxtime = maxtime
+        self.supply = 0
+        self.epoch = 0
+        self.point_history = [Point(0, 0, start_ts, start_block)]
+        self.user_point_history = {}
+        self.locked = {}
+        self.slope_changes = defaultdict(int)
+        self._cache = {}
+
+    @classmethod
+    def from_contract(cls, voting_escrow, from_block=0, to_block="latest", maxtime=MAXTIME):
+        """
+        Build a model by replaying the event history of a deployed `VotingEscrow`.
+
+        `maxtime` must match the `MAXTIME` constant of the contract.
+        """
+        logs = fetch_logs(voting_escrow, ["Deposit", "Withdraw"], from_block, to_block)
+        model = cls(maxtime=maxtime)
+        model.apply_logs(logs)
+        return model
+
+    def apply_logs(self, logs):
+        """
+        Replay decoded `Deposit` / `Withdraw` logs. Logs must be in chain order.
+        """
+        for log in logs:
+            args = log["args"]
+            if log["event"] == "Deposit":
+                self.deposit(
+                    args["provider"],
+                    args["value"],
+                    args["locktime"],
+                    args["ts"],
+                    log["blockNumber"],
+                )
+            elif log["event"] == "Withdraw":
+                self.withdraw(args["provider"], args["ts"], log["blockNumber"])
+
+    def deposit(self, addr, value, unlock_time, ts, blk):
+        """
+        Apply `create_lock`, `increase_amount`, `increase_unlock_time` or `deposit_for`.
+
+        `unlock_time` is the lock end after the action, as logged in `Deposit.locktime`.
+        """
+        old_locked = self.locked.get(_key(addr), EMPTY_LOCK)
+        new_locked = LockedBalance(old_locked.amount + value, unlock_time)
+        self.locked[_key(addr)] = new_locked
+        self.supply += value
+        self._checkpoint(_key(addr), old_locked, new_locked, ts, blk)
+
+    def withdraw(self, addr, ts, blk):
+        """
+        Apply `withdraw` or `force_withdraw`.
+        """
+        old_locked = self.locked.get(_key(addr), EMPTY_LOCK)
+        self.locked[_key(addr)] = EMPTY_LOCK
+        self.supply -= old_locked.amount
+        self._checkpoint(_key(addr), old_locked, EMPTY_LOCK, ts, blk)
+
+    def checkpoint(self, ts, blk):
+        """
+        Apply a global `checkpoint`.
+        """
+        self._checkpoint(None, EMPTY_LOCK, EMPTY_LOCK, ts, blk)
+
+    def _checkpoint(self, addr, old_locked, new_locked, ts, blk):
+        self._cache.clear()
+
+        u_old_slope = u_old_bias = u_new_slope = u_new_bias = 0
+        old_dslope = new_dslope = 0
+        _epoch = self.epoch
+
+        if addr is not None:
+            if old_locked.end > ts and old_locked.amount > 0:
+                u_old_slope = old_locked.amount // self.maxtime
+                u_old_bias = u_old_slope * (old_locked.end - ts)
+            if new_locked.end > ts and new_locked.amount > 0:
+                u_new_slope = new_locked.amount // self.maxtime
+                u_new_bias = u_new_slope * (new_locked.end - ts)
+
+            old_dslope = self.slope_changes[old_locked.end]
+            if new_locked.end != 0:
+                if new_locked.end == old_locked.end:
+                    new_dslope = old_dslope
+                else:
+                    new_dslope = self.slope_changes[new_locked.end]
+
+        last_point = Point(0, 0, ts, blk)
+        if _epoch > 0:
+            last_point = self.point_history[_epoch]
+        bias, slope, last_ts, last_blk = last_point
+        last_checkpoint = last_ts
+        initial_ts, initial_blk = last_ts, last_blk
+
+        block_slope = 0
+        if ts > last_ts:
+            block_slope = MULTIPLIER * (blk - last_blk) // (ts - last_ts)
+
+        t_i = (last_checkpoint // WEEK) * WEEK
+        for i in range(255):
+            t_i += WEEK
+            d_slope = 0
+            if t_i > ts:
+                t_i = ts
+            else:
+                d_slope = self.slope_changes[t_i]
+            bias -= slope * (t_i - last_checkpoint)
+            slope += d_slope
+            bias = max(bias, 0)
+            slope = max(slope, 0)
+            last_checkpoint = t_i
+            last_blk = initial_blk + block_slope * (t_i - initial_ts) // MULTIPLIER
+            _epoch += 1
+            if t_i == ts:
+                last_blk = blk
+                break
+            else:
+                self._set_point(_epoch, Point(bias, slope, t_i, last_blk))
+
+        self.epoch = _epoch
+
+        if addr is not None:
+            slope = max(slope + u_new_slope - u_old_slope, 0)
+            bias = max(bias + u_new_bias - u_old_bias, 0)
+
+        self._set_point(_epoch, Point(bias, slope, t_i, last_blk))
+
+        if addr is not None:
+            if old_locked.end > ts:
+                old_dslope += u_old_slope
+                if new_locked.end == old_locked.end:
+                    old_dslope -= u_new_slope
+                self.slope_changes[old_locked.end] = old_dslope
+
+            if new_locked.end > ts:
+                if new_locked.end > old_locked.end:
+                    new_dslope -= u_new_slope
+                    self.slope_changes[new_locked.end] = new_dslope
+
+            history = self.user_point_history.setdefault(addr, [Point(0, 0, 0, 0)])
+            history.append(Point(u_new_bias, u_new_slope, ts, blk))
+
+    def _set_point(self, epoch, point):
+        if epoch == len(self.point_history):
+            self.point_history.append(point)
+        else:
+            self.point_history[epoch] = point
+
+    # scalar views, matching the contract interface
+
+    def user_point_epoch(self, addr):
+        return len(self.user_point_history.get(_key(addr), [None])) - 1
+
+    def balanceOf(self, addr, t):
+        return int(self.balances([addr], [t])[0, 0])
+
+    def totalSupply(self, t):
+        return int(self.total_supplies([t])[0])
+
+    def totalSupplyAt(self, block, current_block, current_ts):
+        return int(self.total_supply_at([block], current_block, current_ts)[0])
+
+    # vectorized views
+
+    def _user_arrays(self):
+        if "user" not in self._cache:
+            users = list(self.user_point_history)
+            index = {addr: i for i, addr in enumerate(users)}
+            owner, ts, bias, slope = [], [], [], []
+            for i, addr in enumerate(users):
+                points = self.user_point_history[addr][1:]
+                owner += [i] * len(points)
+                ts += [p.ts for p in points]
+                bias += [p.bias for p in points]
+                slope += [p.slope for p in points]
+            owner = np.array(owner, dtype=np.int64)
+            ts = np.array(ts, dtype=np.int64)
+            self._cache["user"] = (
+                index,
+                owner,
+                (owner << _TS_BITS) | ts,
+                ts,
+                np.array(bias, dtype=object),
+                np.array(slope, dtype=object),
+            )
+        return self._cache["user"]
+
+    def _global_arrays(self):
+        if "global" not in self._cache:
+            points = list(self.point_history)
+
+            # extend history with the weekly points `supply_at` walks through after
+            # the last epoch - these are not clamped, same as in the contract
+            bias, slope, ts, _ = points[-1]
+            t_i = (ts // WEEK) * WEEK
+            last_change = max(self.slope_changes, default=0)
+            for i in range(255):
+                t_i += WEEK
+                if t_i > last_change:
+                    break
+                bias -= slope * (t_i - ts)
+                slope += self.slope_changes.get(t_i, 0)
+                ts = t_i
+                points.append(Point(bias, slope, ts, None))
+
+            self._cache["global"] = (
+                np.array([p.ts for p in points], dtype=np.int64),
+                np.array([p.blk for p in self.point_history], dtype=np.int64),
+                np.array([p.bias for p in points], dtype=object),
+                np.array([p.slope for p in points], dtype=object),
+            )
+        return self._cache["global"]
+
+    def balances(self, addrs, timestamps, dtype=object):
+        """
+        Voting power of each account at each timestamp.
+
+        Arguments
+        ---------
+        addrs : list
+            Account addresses.
+        timestamps : array_like
+            Epoch times to query.
+        dtype : type
+            `object` for exact integers, `float` for fast approximate values.
+
+        Returns
+        -------
+        ndarray
+            Array of shape `(len(addrs), len(timestamps))`.
+        """
+        index, owner, keys, ts, bias, slope = self._user_arrays()
+        t = np.asarray(timestamps, dtype=np.int64)
+        uid = np.array([index.get(_key(i), -1) for i in addrs], dtype=np.int64)
+        result = np.zeros((len(uid), len(t)), dtype=dtype)
+        if not len(keys):
+            return result
+
+        query = (uid.clip(0)[:, None] << _TS_BITS) | t[None, :]
+        idx = np.searchsorted(keys, query, side="right") - 1
+        valid = (idx >= 0) & (owner[idx.clip(0)] == uid[:, None])
+        idx = idx.clip(0)
+
+        value = bias[idx].astype(dtype) - slope[idx].astype(dtype) * (t - ts[idx])
+        np.copyto(result, np.maximum(value, 0), where=valid)
+        return result
+
+    def _supply_from(self, epochs, t, dtype):
+        # equivalent of `supply_at(point_history[epoch], t)`
+        ts, _, bias, slope = self._global_arrays()
+        projected = ts[self.epoch + 1 :]
+        idx = np.where(
+            epochs == self.epoch,
+            self.epoch + np.searchsorted(projected, t, side="right"),
+            epochs,
+        )
+        value = bias[idx].astype(dtype) - slope[idx].astype(dtype) * (t - ts[idx])
+        return np.maximum(value, 0)
+
+    def total_supplies(self, timestamps, dtype=object):
+        """
+        Total voting power at each timestamp.
+
+        For timestamps after the latest checkpoint this matches `totalSupply(t)`.
+        For earlier timestamps the result is what `totalSupply(t)` returned at time `t`.
+        """
+        ts = self._global_arrays()[0][: self.epoch + 1]
+        t = np.asarray(timestamps, dtype=np.int64)
+        epochs = (np.searchsorted(ts, t, side="right") - 1).clip(0)
+        return self._supply_from(epochs, t, dtype)
+
+    def total_supply_at(self, blocks, current_block, current_ts, dtype=object):
+        """
+        Total voting power at each block, matching `totalSupplyAt`.
+
+        Block times are interpolated from the point history exactly as the contract
+        does, so `current_block` / `current_ts` are required for blocks after the
+        latest checkpoint.
+        """
+        ts, blk, _, _ = self._global_arrays()
+        ts = ts[: self.epoch + 1]
+        block = np.asarray(blocks, dtype=np.int64)
+        epochs = (np.searchsorted(blk, block, side="right") - 1).clip(0)
+
+        is_last = epochs == self.epoch
+        next_idx = np.minimum(epochs + 1, self.epoch)
+        next_ts = np.where(is_last, current_ts, ts[next_idx])
+        next_blk = np.where(is_last, current_block, blk[next_idx])
+
+        d_blk = next_blk - blk[epochs]
+        dt = np.where(
+            d_blk != 0,
+            (block - blk[epochs]) * (next_ts - ts[epochs]) // np.where(d_blk != 0, d_blk, 1),
+            0,
+        )
+        return self._supply_from(epochs, ts[epochs] + dt, dtype)
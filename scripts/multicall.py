@@ -0,0 +1,123 @@
+"""
+Aggregate many view calls into a single `eth_call` using `Multicall2`.
+
+Calls are given as `(target, method, args)` tuples, where `method` is either a
+brownie contract method or a function ABI fragment. ABI fragments allow calling
+contracts without fetching their full ABI first, e.g. every pool in a registry.
+
+On a network without a known `Multicall2` deployment, the local stand-in from
+`contracts/testing` is deployed once and reused.
+"""
+import eth_abi
+from brownie import Contract, Multicall2, accounts, chain
+from brownie.convert.normalize import format_input, format_output
+from brownie.convert.utils import build_function_selector, get_type_strings
+from eth_abi.exceptions import DecodingError, InsufficientDataBytes
+from hexbytes import HexBytes
+
+# `Multicall2` deployments by chain id
+MULTICALL2 = {
+    1: "0x5BA1e12693Dc8F9c48aAD8770482f4739bEeD696",
+}
+# maximum number of calls aggregated into one `eth_call`
+BATCH_SIZE = 500
+
+_deployments = {}
+
+
+def function_abi(name, inputs, outputs):
+    """
+    Build an ABI fragment for a view function.
+
+    Arguments
+    ---------
+    name : str
+        Function name.
+    inputs : list
+        Input types, e.g. `["uint256"]`.
+    outputs : list
+        Output types.
+    """
+    return {
+        "name": name,
+        "inputs": [{"name": "", "type": i} for i in inputs],
+        "outputs": [{"name": "", "type": i} for i in outputs],
+        "stateMutability": "view",
+        "type": "function",
+    }
+
+
+class Multicall:
+    """
+    Batched view calls against a `Multicall2` contract.
+
+    Arguments
+    ---------
+    address : str, optional
+        `Multicall2` address. Defaults to the known deployment for the active
+        chain, deploying the local stand-in if there is none.
+    batch_size : int
+        Maximum number of calls per `eth_call`.
+    """
+
+    def __init__(self, address=None, batch_size=BATCH_SIZE):
+        if address is None:
+            address = MULTICALL2.get(chain.id) or _deployments.get(chain.id)
+        if address is None:
+            address = Multicall2.deploy({"from": accounts[0]}).address
+            _deployments[chain.id] = address
+
+        self.contract = Contract.from_abi("Multicall2", str(address), Multicall2.abi)
+        self.batch_size = batch_size
+
+    def __call__(self, calls, block_identifier=None):
+        """
+        Perform view calls, `batch_size` at a time.
+
+        Arguments
+        ---------
+        calls : list
+            `(target, method, args)` tuples.
+        block_identifier : int | str, optional
+            Block to make the calls at.
+
+        Returns
+        -------
+        list
+            Decoded return value of each call, or `None` where the call reverted.
+        """
+        abis = []
+        encoded = []
+        for target, method, args in calls:
+            abi = getattr(method, "abi", method)
+            data = format_input(abi, args)
+            data = eth_abi.encode_abi(get_type_strings(abi["inputs"]), data)
+            abis.append(abi)
+            encoded.append((str(target), build_function_selector(abi) + data.hex()))
+
+        results = []
+        for i in range(0, len(encoded), self.batch_size):
+            results += self.contract.tryAggregate.call(
+                False, encoded[i : i + self.batch_size], block_identifier=block_identifier
+            )
+
+        return [self._decode(abi, *result) for abi, result in zip(abis, results)]
+
+    @staticmethod
+    def _decode(abi, success, data):
+        if not success:
+            return None
+        try:
+            result = format_output(
+                abi, eth_abi.decode_abi(get_type_strings(abi["outputs"]), HexBytes(data))
+            )
+        except (DecodingError, InsufficientDataBytes):
+            # the target has no code, or returned data of a different type
+            return None
+        return result[0] if len(result) == 1 else result
+
+    def eth_balance(self, addr):
+        """
+        Call tuple for the ether balance of `addr`.
+        """
+        return (self.contract, self.contract.getEthBalance, (addr,))
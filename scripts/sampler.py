@@ -0,0 +1,119 @@
+"""
+Concurrent sampling of historical on-chain values.
+
+`sample(fn, points)` evaluates `fn(point)` for every point, e.g. a view call at
+many blocks or weeks, with at most `concurrency` requests in flight. Calls run in
+a thread pool driven by `asyncio`, as brownie and web3 are synchronous. Transient
+errors are retried with exponential backoff: connection errors and timeouts,
+JSON-RPC error responses such as rate limits, and `RetryableError`. Anything
+else, e.g. a reverted call, is raised immediately.
+
+Values that can no longer change, such as a view call at a block that is already
+mined, can be cached on disk by passing a `cache` key.
+"""
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from scripts.cache import load, store_many
+
+# maximum number of requests in flight
+CONCURRENCY = 16
+# attempts per point after the first one fails
+RETRIES = 5
+# delay before the first retry, in seconds, doubled on every attempt
+BACKOFF = 0.5
+
+
+class RetryableError(ValueError):
+    """
+    Raised by a sampled function for an error that may succeed on retry, e.g. an
+    error response from a subgraph.
+    """
+
+
+def _is_transient(exc):
+    # web3 raises JSON-RPC error responses as a plain `ValueError` holding the
+    # error object, while reverts raise subclasses such as `ContractLogicError`
+    rpc_error = type(exc) is ValueError and bool(exc.args) and isinstance(exc.args[0], dict)
+    # `requests` connection errors and timeouts are `OSError` subclasses
+    return rpc_error or isinstance(exc, (OSError, RetryableError))
+
+
+async def _fetch(fn, point, semaphore, executor, retries, backoff):
+    loop = asyncio.get_running_loop()
+    async with semaphore:
+        for attempt in range(retries + 1):
+            try:
+                return await loop.run_in_executor(executor, fn, point)
+            except Exception as exc:
+                if attempt == retries or not _is_transient(exc):
+                    raise
+                await asyncio.sleep(backoff * 2 ** attempt)
+
+
+async def sample_async(fn, points, concurrency=CONCURRENCY, retries=RETRIES, backoff=BACKOFF):
+    """
+    Coroutine version of `sample`, without caching.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    with ThreadPoolExecutor(concurrency) as executor:
+        return await asyncio.gather(
+            *(_fetch(fn, point, semaphore, executor, retries, backoff) for point in points)
+        )
+
+
+def sample(
+    fn,
+    points,
+    concurrency=CONCURRENCY,
+    retries=RETRIES,
+    backoff=BACKOFF,
+    cache=None,
+    is_final=None,
+):
+    """
+    Evaluate `fn` at each point concurrently.
+
+    Arguments
+    ---------
+    fn : callable
+        Called with a single point, returns a JSON-serializable value.
+    points : iterable
+        Points to evaluate, e.g. block numbers or timestamps. Must be
+        JSON-serializable when caching.
+    concurrency : int
+        Maximum number of calls in flight.
+    retries : int
+        Number of retries for a point after a transient error.
+    backoff : float
+        Delay before the first retry, in seconds. Doubled for every retry.
+    cache : str, optional
+        Key for caching results on disk, e.g. `"<address>.totalSupplyAt"`.
+        Without it, nothing is cached.
+    is_final : callable, optional
+        Called with a point, returns `True` if its value can no longer change and
+        may be cached. Defaults to caching every point.
+
+    Returns
+    -------
+    list
+        `fn(point)` for each point, in order.
+    """
+    points = list(points)
+    results = [None] * len(points)
+    if cache is not None:
+        keys = [f"{cache}{json.dumps(point)}" for point in points]
+        results = [load("samples", key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    values = asyncio.run(
+        sample_async(fn, [points[i] for i in missing], concurrency, retries, backoff)
+    )
+    for i, value in zip(missing, values):
+        results[i] = value
+    if cache is not None:
+        final = [i for i in missing if is_final is None or is_final(points[i])]
+        store_many("samples", {keys[i]: results[i] for i in final})
+
+    return results
@@ -1,6 +1,13 @@
 import datetime
 
-from brownie import Contract, accounts, history, network
+from brownie import Contract, accounts
+from eth_utils import to_checksum_address
+
+from scripts.cache import get_contract
+from scripts.connections import connect
+from scripts.multicall import function_abi
+from scripts.sampler import sample
+from scripts.tx_runner import TxRunner
 
 # this script is used for bridging CRV rewards to sidechains
 # it should be run once per week, just after the start of the epoch week
@@ -38,29 +45,50 @@ HARMONY = [
     "0xf2Cde8c47C20aCbffC598217Ad5FE6DB9E00b163",
 ]
 
+# `ChildChainStreamer` views used by `get_checkpoint_delta`
+REWARD_TOKENS = function_abi("reward_tokens", ["uint256"], ["address"])
+REWARD_DATA = function_abi(
+    "reward_data", ["address"], ["address", "uint256", "uint256", "uint256", "uint256", "uint256"]
+)
+
 
 def main():
     acct = accounts.load("curve-deploy")
 
+    # every checkpoint is broadcast at once, with nonces assigned locally,
+    # and stuck transactions are rebroadcast with higher fees
+    runner = TxRunner(acct)
+
     # xdai/polygon bridge takes longer so we do it first
     for addr in POLYGON + XDAI:
-        Contract(addr).checkpoint({"from": acct, "priority_fee": "2 gwei"})
+        gauge = get_contract(addr)
+        runner.submit(addr, gauge.checkpoint, tx_params={"priority_fee": "2 gwei"})
 
     # for abritrum, the L1 transaction must include ETH to pay for the L2 transaction
     for addr in ARBITRUM:
-        gauge = Contract(addr)
+        gauge = get_contract(addr)
         value = gauge.get_total_bridge_cost()
-        gauge.checkpoint(
-            {"from": acct, "priority_fee": "2 gwei", "required_confs": 0, "value": value}
-        )
+        runner.submit(addr, gauge.checkpoint, tx_params={"priority_fee": "2 gwei", "value": value})
 
     # for fantom, harmony, avax we must call the gauge through the checkpoint
     # contract in order for the bridge to recognize the transaction
-    checkpoint = Contract("0xa549ffd8e439c4ff746659ed80a6c5e55f9cf3cf")
+    checkpoint = get_contract("0xa549ffd8e439c4ff746659ed80a6c5e55f9cf3cf")
     for addr in FTM + HARMONY + AVAX:
-        checkpoint.checkpoint(addr, {"from": acct, "priority_fee": "2 gwei", "required_confs": 0})
+        runner.submit(addr, checkpoint.checkpoint, addr, tx_params={"priority_fee": "2 gwei"})
+
+    try:
+        results = runner.wait()
+    except TimeoutError as exc:
+        # report every network, including those that are stuck
+        print(exc)
+        results = runner.results()
 
-    history.wait()
+    pending = runner.pending()
+    for addr, tx in results.items():
+        if addr in pending:
+            print(f"Checkpoint still pending for {addr}: {runner.transactions[addr][-1].txid}")
+        elif tx is None or tx.status != 1:
+            print(f"Checkpoint failed for {addr}: {tx.txid if tx else 'dropped'}")
 
 
 def fantom():
@@ -111,20 +139,37 @@ def avax():
         streamer.notify_reward_amount(token, {"from": acct})
 
 
+def _reward_period_finish(point):
+    network_id, streamer_addr, crv_token = point
+    streamer = connect(network_id).eth.contract(
+        to_checksum_address(streamer_addr), abi=[REWARD_DATA]
+    )
+    # (distributor, period_finish, rate, duration, received, paid)
+    return streamer.functions.reward_data(crv_token).call()[1]
+
+
+def _crv_token(point):
+    network_id, streamer_addr = point
+    streamer = connect(network_id).eth.contract(
+        to_checksum_address(streamer_addr), abi=[REWARD_TOKENS]
+    )
+    # reward token 0 is CRV
+    return streamer.functions.reward_tokens(0).call()
+
+
 def get_checkpoint_delta():
-    networks = {f"{k.lower()}-main": v for k, v in globals().items() if k.isupper()}
-
-    for network_id, streamers in networks.items():
-        # connect to appropritate network
-        now = datetime.datetime.now()
-        network.disconnect()
-        network.connect(network_id)
-        print(network_id)
-        # reward token 0 is CRV
-        crv_token = Contract(streamers[-1]).reward_tokens(0)
-        for streamer_addr in streamers:
-            streamer = Contract(streamer_addr)
-            period_finish = datetime.datetime.fromtimestamp(
-                int(streamer.reward_data(crv_token)["period_finish"])
-            )
-            print(streamer.address, "dt:", str(period_finish - now))
+    networks = {
+        f"{k.lower()}-main": v for k, v in globals().items() if k.isupper() and isinstance(v, list)
+    }
+    now = datetime.datetime.now()
+
+    # every network and streamer is queried concurrently, over independent connections
+    crv_tokens = sample(_crv_token, [(k, v[-1]) for k, v in networks.items()])
+    crv_tokens = dict(zip(networks, crv_tokens))
+    points = [(k, addr, crv_tokens[k]) for k, v in networks.items() for addr in v]
+    period_finishes = sample(_reward_period_finish, points)
+
+    print(f"{'network':<16}{'streamer':<44}{'period finish':<22}dt")
+    for (network_id, streamer_addr, _), period_finish in zip(points, period_finishes):
+        period_finish = datetime.datetime.fromtimestamp(period_finish)
+        print(f"{network_id:<16}{streamer_addr:<44}{str(period_finish):<22}{period_finish - now}")
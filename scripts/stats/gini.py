@@ -1,46 +1,87 @@
+import json
+
 import numpy as np
 import pylab
 import requests
 from brownie import web3
 
+from scripts.sampler import RetryableError, sample
+
 START_BLOCK = 10647813 + 86400
+SAMPLES = 50
 graph_url = "https://api.thegraph.com/subgraphs/name/pengiundev/curve-votingescrow3"
-query = {
-    "query": """query ($block: Int!, $first: Int!, $skip: Int!) {\n  userBalances(orderBy: weight, orderDirection: desc, first: $first, skip: $skip, block: {number: $block}) {\n    id\n    startTx\n    user\n    CRVLocked\n lock_start\n    unlock_time\n    weight\n    __typename\n  }\n}\n""",  # noqa
-    "variables": {"block": None, "first": 1000, "skip": 0},
-}
+# holders are paged by id, as the subgraph caps `skip`
+PAGE_SIZE = 1000
+# seconds before a stalled subgraph request fails and is retried by the sampler
+REQUEST_TIMEOUT = 60
+query = """query ($block: Int!, $first: Int!, $last: String!) {\n  userBalances(orderBy: id, orderDirection: asc, first: $first, where: {id_gt: $last}, block: {number: $block}) {\n    id\n    weight\n  }\n}\n"""  # noqa
 
 
 def gini(x):
-    # from https://stackoverflow.com/questions/39512260/calculating-gini-coefficient-in-python-numpy
-    # (Warning: This is a concise implementation, but it is O(n**2)
-    # in time and memory, where n = len(x).  *Don't* pass in huge
-    # samples!)
-
-    # Mean absolute difference
-    mad = np.abs(np.subtract.outer(x, x)).mean()
-    # Relative mean absolute difference
-    rmad = mad / np.mean(x)
-    # Gini coefficient
-    g = 0.5 * rmad
-    return g
-
-
-def main():
-    current_block = web3.eth.blockNumber
-    blocks = np.linspace(START_BLOCK, current_block, 50)
+    """
+    Gini coefficient of `x`, in O(n log n) time and O(n) memory.
+
+    Equal to half the relative mean absolute difference over all pairs,
+    including each value with itself.
+    """
+    x = np.sort(np.asarray(x, dtype=float))
+    n = len(x)
+    if n == 0 or not x.sum():
+        return 0.0
+    # sum over pairs of |x_i - x_j| == 2 * sum((2i - n - 1) * x_i), for ascending 1-indexed x
+    index = np.arange(1, n + 1)
+    return float(((2 * index - n - 1) * x).sum() / (n * x.sum()))
+
+
+def get_weights(block):
+    """
+    veCRV weight of every holder at `block`, as integers.
+    """
+    weights = []
+    last = ""
+    while True:
+        variables = {"block": block, "first": PAGE_SIZE, "last": last}
+        resp = requests.post(
+            graph_url,
+            json={"query": query, "variables": variables},
+            timeout=REQUEST_TIMEOUT,
+        ).json()
+        if "data" not in resp:
+            raise RetryableError(resp.get("errors"))
+        page = resp["data"]["userBalances"]
+        weights += [int(u["weight"]) for u in page]
+        if len(page) < PAGE_SIZE:
+            return weights
+        last = page[-1]["id"]
+
+
+def main(record=None, replay=None):
+    """
+    Plot the veCRV Gini coefficient over time.
+
+    Arguments
+    ---------
+    record : str, optional
+        Path to save the fetched weights to, as JSON.
+    replay : str, optional
+        Path of previously recorded weights. Nothing is fetched.
+    """
+    if replay is not None:
+        with open(replay) as fp:
+            samples = json.load(fp)
+        blocks = [int(i) for i in samples]
+        weights = [[int(i) for i in samples[str(block)]] for block in blocks]
+    else:
+        current_block = web3.eth.blockNumber
+        blocks = [int(i) for i in np.linspace(START_BLOCK, current_block, SAMPLES)]
+        weights = sample(get_weights, blocks, concurrency=8)
+        if record is not None:
+            with open(record, "w") as fp:
+                json.dump({block: [str(i) for i in w] for block, w in zip(blocks, weights)}, fp)
+
     ginis = []
-    for block in blocks:
-        query["variables"]["block"] = int(block)
-        while True:
-            try:
-                resp = requests.post(graph_url, json=query).json()
-                weights = [int(u["weight"]) / 1e18 for u in resp["data"]["userBalances"]]
-            except KeyError:
-                print("Error")
-                continue
-            break
-        ginis.append(gini(weights))
+    for block, w in zip(blocks, weights):
+        ginis.append(gini(np.array(w, dtype=float) / 1e18))
         print(block, ginis[-1])
 
     pylab.plot(blocks, ginis)
@@ -1,15 +1,44 @@
 import numpy as np
 import pylab
-from brownie import Contract, web3
+from brownie import chain
+
+from scripts.cache import get_contract
+from scripts.models.voting_escrow import VotingEscrowModel
+from scripts.sampler import sample
 
 START_BLOCK = 10647813
+SAMPLES = 1000
+# veCRV locks for up to four years, unlike the Ribbon `VotingEscrow`
+VECRV_MAXTIME = 4 * 365 * 86400
+
+
+def main(source="model"):
+    """
+    Plot total veCRV over time.
 
+    With `source="chain"`, samples `totalSupplyAt` from the node concurrently
+    instead of replaying the lock history.
+    """
+    vecrv = get_contract("0x5f3b5DfEb7B28CDbD7FAba78963EE202a494e2A2")
+    current = chain[-1]
+    blocks = np.linspace(START_BLOCK, current.number, SAMPLES).astype(int)
 
-def main():
-    vecrv = Contract("0x5f3b5DfEb7B28CDbD7FAba78963EE202a494e2A2")
-    current_block = web3.eth.blockNumber
-    blocks = np.linspace(START_BLOCK, current_block, 100)
-    powers = [vecrv.totalSupplyAt(int(block)) / 1e18 for block in blocks]
+    if source == "chain":
+        powers = sample(
+            vecrv.totalSupplyAt,
+            [int(i) for i in blocks],
+            cache=f"{vecrv.address}.totalSupplyAt",
+            is_final=lambda block: block < current.number,
+        )
+        powers = np.array(powers, dtype=float) / 1e18
+    else:
+        # replay the lock history once, then evaluate every sample offline
+        model = VotingEscrowModel.from_contract(
+            vecrv, START_BLOCK, current.number, maxtime=VECRV_MAXTIME
+        )
+        powers = (
+            model.total_supply_at(blocks, current.number, current.timestamp, dtype=float) / 1e18
+        )
 
     pylab.plot(blocks, powers)
     pylab.xlabel("Block number")
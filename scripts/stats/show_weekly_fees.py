@@ -2,30 +2,38 @@ from datetime import datetime
 from time import time
 
 import pylab  # Requires matplotlib
-from brownie import Contract
+
+from scripts.cache import get_contract
+from scripts.sampler import sample
 
 WEEK = 86400 * 7
 
 
 def main():
-    distributor = Contract("0xA464e6DCda8AC41e03616F95f4BC98a13b8922Dc")
-    tri_pool = Contract("0xbEbc44782C7dB0a1A60Cb6fe97d0b483032FF1C7")
+    distributor = get_contract("0xA464e6DCda8AC41e03616F95f4BC98a13b8922Dc")
+    tri_pool = get_contract("0xbEbc44782C7dB0a1A60Cb6fe97d0b483032FF1C7")
     t = int(time()) // WEEK * WEEK
     virtual_price = tri_pool.get_virtual_price() / 1e18
 
-    output = []
-    while True:
-        fees = distributor.tokens_per_week(t)
-        if fees == 0 and len(output) > 0:
-            break
-        d = datetime.fromtimestamp(t)
-        output.append((d, fees))
-        t -= WEEK
-    if output[0][1] == 0:
-        output = output[1:]
+    # weeks before the last token checkpoint can no longer receive fees
+    last_token_time = distributor.last_token_time()
+    weeks = list(range(distributor.start_time(), t + WEEK, WEEK))
+    output = sample(
+        distributor.tokens_per_week,
+        weeks,
+        cache=f"{distributor.address}.tokens_per_week",
+        is_final=lambda week: week + WEEK <= last_token_time,
+    )
+
+    # skip empty weeks before the first distribution and the current week
+    start = next((i for i, fees in enumerate(output) if fees), len(output))
+    if output and output[-1] == 0:
+        output = output[:-1]
+
     dates = []
     fees = []
-    for d, fee in output[::-1]:
+    for week, fee in zip(weeks[start:], output[start:]):
+        d = datetime.fromtimestamp(week)
         dates.append(d)
         fees.append(fee * virtual_price / 1e18)
         print("{0}|\t${1:.2f}".format(d, fees[-1]))
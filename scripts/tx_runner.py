@@ -0,0 +1,187 @@
+"""
+Submit many transactions from one account without waiting on each in turn.
+
+Nonces are assigned locally, so every transaction can be broadcast immediately
+with `required_confs: 0` and land in the same block. Pending transactions are
+tracked together, and any still pending after `stuck_timeout` seconds is
+rebroadcast at the same nonce with fees multiplied by `fee_bump`. Once every
+pending transaction has used up `max_bumps` and is stuck again, waiting stops
+with a `TimeoutError` rather than polling forever. Optionally,
+`max_in_flight` caps the number of pending transactions, so long pipelines do
+not flood the mempool, and `on_replace` is told about every rebroadcast, e.g.
+to journal it.
+"""
+import time
+
+from brownie import web3
+
+# multiplier applied to the fees of a stuck transaction, nodes require at least 1.1
+FEE_BUMP = 1.125
+# seconds before a pending transaction is considered stuck
+STUCK_TIMEOUT = 180
+# maximum number of fee bumps per transaction
+MAX_BUMPS = 5
+# seconds between checks on pending transactions
+POLL_INTERVAL = 5
+
+
+class TxRunner:
+    """
+    Concurrent transaction submission with local nonce management.
+
+    Arguments
+    ---------
+    sender : Account
+        Account sending every transaction.
+    fee_bump : float
+        Fee multiplier for rebroadcasting a stuck transaction.
+    stuck_timeout : int
+        Seconds a transaction may stay pending before its fees are bumped.
+    max_bumps : int
+        Maximum number of rebroadcasts per transaction.
+    max_in_flight : int, optional
+        Maximum number of pending transactions. `submit` blocks until one is
+        mined when the limit is reached. Unlimited if not given.
+    on_replace : callable, optional
+        Called with the label and the new `TransactionReceipt` whenever a stuck
+        transaction is rebroadcast.
+    """
+
+    def __init__(
+        self,
+        sender,
+        fee_bump=FEE_BUMP,
+        stuck_timeout=STUCK_TIMEOUT,
+        max_bumps=MAX_BUMPS,
+        max_in_flight=None,
+        on_replace=None,
+    ):
+        self.sender = sender
+        self.fee_bump = fee_bump
+        self.stuck_timeout = stuck_timeout
+        self.max_bumps = max_bumps
+        self.max_in_flight = max_in_flight
+        self.on_replace = on_replace
+
+        # include transactions already pending from this account
+        self.nonce = web3.eth.get_transaction_count(str(sender), "pending")
+        # label -> every broadcast of the transaction, latest last
+        self.transactions = {}
+        self._submitted_at = {}
+
+    def submit(self, label, method, *args, tx_params=None):
+        """
+        Broadcast a transaction at the next local nonce, without waiting for it.
+
+        Arguments
+        ---------
+        label : str
+            Unique name of the transaction, used for reporting.
+        method : ContractTx
+            Contract method to call.
+        *args
+            Arguments of the call.
+        tx_params : dict, optional
+            Transaction parameters, e.g. `priority_fee` or `value`. `from`,
+            `nonce` and `required_confs` are set by the runner.
+
+        Returns
+        -------
+        TransactionReceipt
+
+        Raises
+        ------
+        TimeoutError
+            If `max_in_flight` is reached and every pending transaction is stuck
+            after `max_bumps` fee bumps.
+        """
+        if label in self.transactions:
+            raise ValueError(f"Duplicate label: {label}")
+        if self.max_in_flight is not None:
+            while len(self.pending()) >= self.max_in_flight:
+                self._bump_stuck()
+                time.sleep(POLL_INTERVAL)
+
+        tx_params = dict(tx_params or {}, **{"from": self.sender, "nonce": self.nonce})
+        tx_params["required_confs"] = 0
+        tx = method(*args, tx_params)
+
+        self.nonce += 1
+        self.transactions[label] = [tx]
+        self._submitted_at[label] = time.time()
+        return tx
+
+    def _included(self, label):
+        # a replaced transaction may still be mined instead of its replacement
+        return next((tx for tx in self.transactions[label] if tx.status >= 0), None)
+
+    def pending(self):
+        """
+        Labels of transactions that have not been mined or dropped yet.
+        """
+        return [
+            label
+            for label, txs in self.transactions.items()
+            if self._included(label) is None and any(tx.status == -1 for tx in txs)
+        ]
+
+    def wait(self):
+        """
+        Wait until every transaction is mined, bumping the fees of stuck ones.
+
+        Returns
+        -------
+        dict
+            `{label: TransactionReceipt}` of the mined transaction for each label.
+            Reverted transactions are included, with a status of 0. Transactions
+            dropped without any broadcast being mined are `None`.
+
+        Raises
+        ------
+        TimeoutError
+            If every pending transaction is stuck after `max_bumps` fee bumps.
+        """
+        while self.pending():
+            self._bump_stuck()
+            time.sleep(POLL_INTERVAL)
+
+        return self.results()
+
+    def results(self):
+        """
+        Mined transaction of each label so far, without waiting.
+
+        Returns
+        -------
+        dict
+            `{label: TransactionReceipt}`, `None` for labels that are still pending
+            or were dropped.
+        """
+        return {label: self._included(label) for label in self.transactions}
+
+    def _bump_stuck(self):
+        pending = self.pending()
+        exhausted = []
+        for label in pending:
+            bumps = len(self.transactions[label]) - 1
+            if time.time() - self._submitted_at[label] < self.stuck_timeout:
+                continue
+            if bumps >= self.max_bumps:
+                exhausted.append(label)
+                continue
+            tx = self.transactions[label][-1]
+            print(f"{label}: pending for {self.stuck_timeout}s, bumping fees")
+            try:
+                replacement = tx.replace(increment=self.fee_bump)
+            except ValueError:
+                # confirmed in the meantime
+                continue
+            self.transactions[label].append(replacement)
+            self._submitted_at[label] = time.time()
+            if self.on_replace is not None:
+                self.on_replace(label, replacement)
+
+        if pending and len(exhausted) == len(pending):
+            raise TimeoutError(
+                f"Still pending after {self.max_bumps} fee bumps: {', '.join(exhausted)}"
+            )
@@ -13,6 +13,8 @@ from brownie import (
 )
 from brownie_tokens import ERC20
 
+from scripts.models.minter import ERC20CRVModel
+
 YEAR = 365 * 86400
 INITIAL_RATE = 274_815_283
 YEAR_1_SUPPLY = INITIAL_RATE * 10 ** 18 // YEAR * YEAR
@@ -41,16 +43,11 @@ def isolation_setup(fn_isolation):
 
 @pytest.fixture(scope="module")
 def theoretical_supply(chain, token):
+    # the schedule is fixed at deployment, so it is only read from the chain once
+    model = ERC20CRVModel.from_contract(token)
+
     def _fn():
-        epoch = token.mining_epoch()
-        q = 1 / 2 ** 0.25
-        S = INITIAL_SUPPLY * 10 ** 18
-        if epoch > 0:
-            S += int(YEAR_1_SUPPLY * (1 - q ** epoch) / (1 - q))
-        S += int(YEAR_1_SUPPLY // YEAR * q ** epoch) * (
-            chain[-1].timestamp - token.start_epoch_time()
-        )
-        return S
+        return model.supply_at([chain[-1].timestamp])[0]
 
     yield _fn
 
@@ -0,0 +1,73 @@
+from random import Random
+
+import pytest
+
+from scripts.models.fee_distributor import FeeDistributorModel
+from scripts.models.voting_escrow import VotingEscrowModel
+
+WEEK = 86400 * 7
+# fixed seed, so every run replays the same deposits and sleeps
+SEED = 1337
+
+
+@pytest.fixture(scope="module")
+def distributor(accounts, chain, fee_distributor, ve_rbn_rewards, voting_escrow, token):
+    distributor = fee_distributor()
+
+    for acct in accounts[:5]:
+        token.transfer(acct, 10 ** 24, {"from": accounts[0]})
+        token.approve(voting_escrow, 2 ** 256 - 1, {"from": acct})
+
+    yield distributor
+
+
+def _distribute(accounts, chain, distributor, voting_escrow, weeks):
+    rng = Random(SEED)
+    for i, acct in enumerate(accounts[:5]):
+        # locks outlast the loop below, so `increase_amount` never hits an expired lock
+        voting_escrow.create_lock(
+            rng.randrange(10 ** 18, 10 ** 22),
+            chain.time() + (weeks + 2 + i) * WEEK,
+            {"from": acct},
+        )
+        chain.sleep(rng.randrange(3600, 86400))
+
+    for i in range(weeks):
+        accounts[0].transfer(distributor, rng.randrange(10 ** 17, 10 ** 19))
+        distributor.checkpoint_token({"from": accounts[0]})
+        distributor.checkpoint_total_supply({"from": accounts[0]})
+        voting_escrow.increase_amount(10 ** 18, {"from": accounts[i % 2]})
+        chain.sleep(rng.randrange(86400, WEEK))
+
+    chain.sleep(WEEK)
+    distributor.checkpoint_token({"from": accounts[0]})
+    distributor.checkpoint_total_supply({"from": accounts[0]})
+
+
+def test_claimable_per_week(accounts, chain, distributor, voting_escrow):
+    _distribute(accounts, chain, distributor, voting_escrow, 8)
+
+    ve_model = VotingEscrowModel.from_contract(voting_escrow)
+    model = FeeDistributorModel.from_contract(distributor, ve_model)
+    weeks, amounts = model.claimable_per_week(accounts[:6])
+
+    for acct, expected in zip(accounts[:6], amounts.sum(axis=1)):
+        tx = distributor.claim(acct, {"from": acct})
+        assert tx.return_value == expected
+
+
+def test_claim(accounts, chain, distributor, voting_escrow):
+    _distribute(accounts, chain, distributor, voting_escrow, 3)
+
+    ve_model = VotingEscrowModel.from_contract(voting_escrow)
+    model = FeeDistributorModel.from_contract(distributor, ve_model)
+
+    for acct in accounts[:5]:
+        tx = distributor.claim(acct, {"from": acct})
+        event = tx.events["Claimed"]
+        assert model.claim(acct, tx.timestamp) == (
+            event["amount"],
+            event["claim_epoch"],
+            event["max_epoch"],
+        )
+        assert model.time_cursor_of[str(acct).lower()] == distributor.time_cursor_of(acct)
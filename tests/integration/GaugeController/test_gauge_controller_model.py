@@ -0,0 +1,84 @@
+import pytest
+from brownie import chain
+from brownie.test import given, strategy
+from hypothesis import settings
+
+from scripts.models.gauge_controller import GaugeControllerModel
+
+WEEK = 86400 * 7
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(gauge_controller, accounts, three_gauges, token, voting_escrow, ve_rbn_rewards):
+    gauge_controller.add_type(b"Liquidity", 10 ** 18, {"from": accounts[0]})
+    gauge_controller.add_type(b"Crypto", 2 * 10 ** 18, {"from": accounts[0]})
+    for i, gauge in enumerate(three_gauges):
+        gauge_controller.add_gauge(gauge, i % 2, {"from": accounts[0]})
+
+    for acct in accounts[:3]:
+        token.transfer(acct, 10 ** 24, {"from": accounts[0]})
+        token.approve(voting_escrow, 10 ** 24, {"from": acct})
+
+    gauge_controller.set_voting_enabled(True, {"from": accounts[0]})
+
+
+@given(
+    st_deposits=strategy("uint256[3]", min_value=10 ** 21, max_value=10 ** 23),
+    st_length=strategy("uint256[3]", min_value=4, max_value=100),
+    st_votes=strategy("uint[2][3]", min_value=0, max_value=5),
+)
+@settings(max_examples=10)
+def test_relative_weight_forecast(
+    accounts, gauge_controller, three_gauges, voting_escrow, st_deposits, st_length, st_votes
+):
+    for i, acct in enumerate(accounts[:3]):
+        voting_escrow.create_lock(
+            st_deposits[i], chain.time() + st_length[i] * WEEK, {"from": acct}
+        )
+
+    for i, acct in enumerate(accounts[:3]):
+        votes = [x * 1000 for x in st_votes[i]]
+        votes.append(10000 - sum(votes))
+        for gauge, weight in zip(three_gauges, votes):
+            gauge_controller.vote_for_gauge_weights(gauge, weight, {"from": acct})
+        chain.sleep(3600)
+
+    gauge_controller.change_type_weight(1, 3 * 10 ** 18, {"from": accounts[0]})
+
+    model = GaugeControllerModel.from_contracts(gauge_controller, voting_escrow)
+    assert model.points_total[model.time_total] == gauge_controller.get_total_weight()
+
+    weeks = [(chain.time() // WEEK + i) * WEEK for i in range(30)]
+    forecast = model.gauge_relative_weights(weeks, three_gauges)
+
+    for idx, week in enumerate(weeks):
+        if week > chain.time():
+            chain.sleep(week - chain.time())
+        for gauge in three_gauges:
+            gauge_controller.checkpoint_gauge(gauge, {"from": accounts[0]})
+        for gauge, expected in zip(three_gauges, forecast[:, idx]):
+            assert gauge_controller.gauge_relative_weight(gauge, week) == expected
+
+
+def test_hypothetical_vote(accounts, gauge_controller, three_gauges, voting_escrow):
+    voting_escrow.create_lock(10 ** 22, chain.time() + 50 * WEEK, {"from": accounts[0]})
+    model = GaugeControllerModel.from_contracts(gauge_controller, voting_escrow)
+
+    next_week = (chain.time() // WEEK + 1) * WEEK
+    model.vote_for_gauge_weights(accounts[0], three_gauges[2], 10000, chain.time())
+    forecast = model.gauge_relative_weights([next_week], three_gauges)
+
+    gauge_controller.vote_for_gauge_weights(three_gauges[2], 10000, {"from": accounts[0]})
+    for gauge, expected in zip(three_gauges, forecast[:, 0]):
+        assert gauge_controller.gauge_relative_weight(gauge, next_week) == expected
+
+
+def test_vote_delay(accounts, gauge_controller, three_gauges, voting_escrow):
+    voting_escrow.create_lock(10 ** 22, chain.time() + 50 * WEEK, {"from": accounts[0]})
+    model = GaugeControllerModel.from_contracts(gauge_controller, voting_escrow)
+
+    now = chain.time()
+    model.vote_for_gauge_weights(accounts[0], three_gauges[0], 5000, now)
+    with pytest.raises(ValueError, match="Cannot vote so often"):
+        model.vote_for_gauge_weights(accounts[0], three_gauges[0], 0, now + 86400)
+    model.vote_for_gauge_weights(accounts[0], three_gauges[0], 0, now + 10 * 86400)
@@ -0,0 +1,57 @@
+from random import randrange
+
+import pytest
+
+from scripts.models.liquidity_gauge import (
+    boosts,
+    max_boost_voting_balances,
+    working_balances,
+    working_supply,
+)
+
+MAX_UINT256 = 2 ** 256 - 1
+WEEK = 7 * 86400
+
+
+def test_working_balances(
+    chain, accounts, gauge_v5, voting_escrow, ve_rbn_rewards, token, mock_lp_token
+):
+    users = accounts[:5]
+    for i, acct in enumerate(users):
+        token.transfer(acct, 10 ** 22, {"from": accounts[0]})
+        token.approve(voting_escrow, MAX_UINT256, {"from": acct})
+        if i:
+            voting_escrow.create_lock(
+                randrange(10 ** 18, 10 ** 22), chain.time() + i * 20 * WEEK, {"from": acct}
+            )
+        mock_lp_token.transfer(acct, 10 ** 22, {"from": accounts[0]})
+        mock_lp_token.approve(gauge_v5, MAX_UINT256, {"from": acct})
+        gauge_v5.deposit(randrange(10 ** 18, 10 ** 22), {"from": acct})
+
+    chain.sleep(WEEK)
+    old_working = [gauge_v5.working_balances(acct) for acct in users]
+    old_supply = gauge_v5.working_supply()
+
+    inputs = []
+    for acct in users:
+        tx = gauge_v5.user_checkpoint(acct, {"from": acct})
+        inputs.append(
+            (
+                gauge_v5.balanceOf(acct),
+                gauge_v5.totalSupply(),
+                voting_escrow.balanceOf(acct, tx.timestamp),
+                voting_escrow.totalSupply(tx.timestamp),
+            )
+        )
+
+    balances, supplies, voting_balances, voting_totals = zip(*inputs)
+    working = working_balances(balances, supplies, voting_balances, voting_totals)
+
+    assert list(working) == [gauge_v5.working_balances(acct) for acct in users]
+    assert working_supply(old_supply, old_working, working) == gauge_v5.working_supply()
+    # the first user has no lock, so only the tokenless share of their balance counts
+    assert working[0] == balances[0] * 40 // 100
+    assert boosts(balances, working)[0] == pytest.approx(1)
+
+    required = max_boost_voting_balances(balances, supplies, voting_totals)
+    assert list(working_balances(balances, supplies, required, voting_totals)) == list(balances)
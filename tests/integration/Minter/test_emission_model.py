@@ -0,0 +1,46 @@
+from scripts.models.minter import ERC20CRVModel, MinterModel
+
+WEEK = 86400 * 7
+YEAR = 86400 * 365
+
+
+def test_minter_committed_rates(accounts, chain, minter):
+    model = MinterModel.from_contract(minter)
+    rates = []
+
+    for i in range(6):
+        if i % 2:
+            minter.commit_next_emission(10_000 * (80 - i) * 10 ** 18, {"from": accounts[0]})
+            model.commit_next_emission(10_000 * (80 - i) * 10 ** 18)
+        chain.sleep(minter.start_epoch_time() + 2 * WEEK - chain.time())
+        tx = minter.update_mining_parameters({"from": accounts[0]})
+        rates.append(minter.rate())
+
+        # projection made before the update matches the rate applied on-chain
+        assert model.mintable_in_timeframe([tx.timestamp], [tx.timestamp + 1])[0] == rates[-1]
+        model.update_mining_parameters(tx.timestamp)
+
+    assert model.rates == rates
+    assert MinterModel.from_contract(minter).rates == rates
+
+    start = minter.start_epoch_time() - 5 * 2 * WEEK
+    timestamps = [start + i * WEEK for i in range(12)]
+    expected = [sum(rates[: i // 2]) * 2 * WEEK + (i % 2) * rates[i // 2] * WEEK for i in range(12)]
+    assert list(model.supply_at(timestamps)) == expected
+
+
+def test_token_supply(accounts, chain, token, theoretical_supply):
+    model = ERC20CRVModel.from_contract(token)
+
+    for i in range(4):
+        chain.sleep(token.start_epoch_time() + YEAR - chain.time())
+        token.update_mining_parameters({"from": accounts[0]})
+        chain.sleep(YEAR // 3)
+        chain.mine()
+
+        now = chain[-1].timestamp
+        assert model.supply_at([now])[0] == token.available_supply()
+        assert theoretical_supply() == token.available_supply()
+        assert model.mintable_in_timeframe([now - YEAR // 4], [now])[0] == (
+            token.mintable_in_timeframe(now - YEAR // 4, now)
+        )
@@ -0,0 +1,60 @@
+from random import randrange
+
+import pytest
+
+from scripts.models.penalty_distributor import PenaltyDistributorModel
+
+WEEK = 86400 * 7
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(accounts, token, voting_escrow, ve_rbn_rewards):
+    for acct in accounts[:6]:
+        token.transfer(acct, 10 ** 24, {"from": accounts[0]})
+        token.approve(voting_escrow, 2 ** 256 - 1, {"from": acct})
+    token.approve(ve_rbn_rewards, 2 ** 256 - 1, {"from": accounts[0]})
+
+
+def test_claimable(accounts, chain, token, voting_escrow, ve_rbn_rewards):
+    for i, acct in enumerate(accounts[:6]):
+        voting_escrow.create_lock(
+            randrange(10 ** 20, 10 ** 22), chain.time() + (i + 4) * 10 * WEEK, {"from": acct}
+        )
+        chain.sleep(randrange(3600, 86400))
+
+    for i in range(8):
+        chain.sleep(randrange(86400 * 2, WEEK))
+        ve_rbn_rewards.checkpoint_total_supply({"from": accounts[0]})
+        if i % 3 == 0:
+            voting_escrow.force_withdraw({"from": accounts[i // 3 + 1]})
+        else:
+            ve_rbn_rewards.donate(randrange(10 ** 18, 10 ** 20), {"from": accounts[0]})
+
+    chain.sleep(WEEK)
+    ve_rbn_rewards.checkpoint_token({"from": accounts[0]})
+    ve_rbn_rewards.checkpoint_total_supply({"from": accounts[0]})
+    ve_rbn_rewards.claim(accounts[4], {"from": accounts[4]})
+
+    model = PenaltyDistributorModel.from_contracts(ve_rbn_rewards, voting_escrow)
+    assert model.last_token_time == ve_rbn_rewards.last_token_time()
+    assert model.token_last_balance == ve_rbn_rewards.token_last_balance()
+    assert model.token_balance == token.balanceOf(ve_rbn_rewards)
+    assert len(model.penalties) == 3
+
+    for acct, expected in zip(accounts[:7], model.claimable(accounts[:7])):
+        assert ve_rbn_rewards.claimable(acct) == expected
+
+
+def test_force_withdraw_penalty(accounts, chain, token, voting_escrow, ve_rbn_rewards):
+    voting_escrow.create_lock(10 ** 21, chain.time() + 60 * WEEK, {"from": accounts[1]})
+    chain.sleep(WEEK)
+    model = PenaltyDistributorModel.from_contracts(ve_rbn_rewards, voting_escrow)
+
+    chain.mine()
+    balance = token.balanceOf(ve_rbn_rewards)
+    tx = voting_escrow.force_withdraw({"from": accounts[1]})
+
+    assert model.withdraw(accounts[1], tx.timestamp, tx.block_number) == (
+        token.balanceOf(ve_rbn_rewards) - balance
+    )
+    assert model.last_token_time == ve_rbn_rewards.last_token_time()
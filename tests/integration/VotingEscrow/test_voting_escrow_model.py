@@ -0,0 +1,94 @@
+from random import choice, random, randrange
+
+import pytest
+
+from scripts.models.voting_escrow import VotingEscrowModel
+
+WEEK = 86400 * 7
+MAXTIME = 86400 * 365 * 2
+
+
+@pytest.fixture(scope="module", autouse=True)
+def setup(accounts, token, voting_escrow, ve_rbn_rewards):
+    for acct in accounts[:5]:
+        token.transfer(acct, 10 ** 24, {"from": accounts[0]})
+        token.approve(voting_escrow, 2 ** 256 - 1, {"from": acct})
+
+
+def _random_actions(chain, accounts, voting_escrow, count):
+    # perform random actions, recording the live views after each one
+    snapshots = []
+    for i in range(count):
+        acct = choice(accounts[:5])
+        amount, end = voting_escrow.locked(acct)
+        now = chain.time()
+
+        if amount == 0:
+            voting_escrow.create_lock(
+                randrange(10 ** 18, 10 ** 22), now + randrange(1, 104) * WEEK, {"from": acct}
+            )
+        elif end <= now:
+            voting_escrow.withdraw({"from": acct})
+        elif random() < 0.3:
+            voting_escrow.force_withdraw({"from": acct})
+        elif random() < 0.5:
+            voting_escrow.increase_amount(randrange(1, 10 ** 21), {"from": acct})
+        elif end + WEEK <= now + MAXTIME:
+            voting_escrow.increase_unlock_time(end + WEEK, {"from": acct})
+
+        chain.sleep(randrange(3600, 3 * WEEK))
+        chain.mine()
+        t = chain[-1].timestamp
+        snapshots.append(
+            (
+                chain[-1].number,
+                t,
+                voting_escrow.totalSupply(t),
+                [voting_escrow.balanceOf(acct, t) for acct in accounts[:5]],
+            )
+        )
+
+    return snapshots
+
+
+def test_historic_views(chain, accounts, voting_escrow):
+    snapshots = _random_actions(chain, accounts, voting_escrow, 30)
+    model = VotingEscrowModel.from_contract(voting_escrow)
+
+    timestamps = [i[1] for i in snapshots]
+    assert list(model.total_supplies(timestamps)) == [i[2] for i in snapshots]
+
+    balances = model.balances(accounts[:5], timestamps)
+    for idx, (_, _, _, expected) in enumerate(snapshots):
+        assert list(balances[:, idx]) == expected
+
+
+def test_future_views(chain, accounts, voting_escrow):
+    _random_actions(chain, accounts, voting_escrow, 30)
+    model = VotingEscrowModel.from_contract(voting_escrow)
+
+    timestamps = list(range(chain[-1].timestamp, chain[-1].timestamp + MAXTIME, 5 * 86400 + 17))
+    supplies = model.total_supplies(timestamps)
+    balances = model.balances(accounts[:5], timestamps)
+
+    for idx in range(0, len(timestamps), 10):
+        t = timestamps[idx]
+        assert supplies[idx] == voting_escrow.totalSupply(t)
+        for acct, balance in zip(accounts[:5], balances[:, idx]):
+            assert balance == voting_escrow.balanceOf(acct, t)
+
+
+def test_total_supply_at(chain, accounts, voting_escrow):
+    snapshots = _random_actions(chain, accounts, voting_escrow, 30)
+    model = VotingEscrowModel.from_contract(voting_escrow)
+
+    # blocks after the final checkpoint depend on the block used for the call
+    blocks = [i[0] for i in snapshots if i[0] < model.point_history[-1].blk]
+    supplies = model.total_supply_at(blocks, chain[-1].number, chain[-1].timestamp)
+    assert list(supplies) == [voting_escrow.totalSupplyAt(i) for i in blocks]
+
+
+def test_unknown_account(accounts, voting_escrow, chain):
+    model = VotingEscrowModel.from_contract(voting_escrow)
+
+    assert model.balanceOf(accounts[9], chain.time()) == 0
@@ -0,0 +1,44 @@
+import pytest
+
+from scripts.multicall import Multicall, function_abi
+
+BALANCES = function_abi("balances", ["uint256"], ["uint256"])
+
+
+@pytest.fixture(scope="module")
+def multicall(Multicall2, accounts):
+    yield Multicall(Multicall2.deploy({"from": accounts[0]}))
+
+
+def test_view_calls(accounts, multicall, token, voting_escrow):
+    calls = [(token, token.balanceOf, (acct,)) for acct in accounts[:3]]
+    calls.append((voting_escrow, voting_escrow.token, ()))
+
+    assert multicall(calls) == [token.balanceOf(i) for i in accounts[:3]] + [token]
+
+
+def test_abi_fragment(accounts, multicall, token):
+    calls = [(token, function_abi("balanceOf", ["address"], ["uint256"]), (accounts[0],))]
+
+    assert multicall(calls) == [token.balanceOf(accounts[0])]
+
+
+def test_failed_calls(accounts, multicall, token):
+    # `token` has no `balances` method, `accounts[1]` has no code
+    calls = [(token, BALANCES, (0,)), (accounts[1], BALANCES, (0,)), (token, token.decimals, ())]
+
+    assert multicall(calls) == [None, None, 18]
+
+
+def test_eth_balance(accounts, multicall):
+    assert multicall([multicall.eth_balance(i) for i in accounts[:2]]) == [
+        accounts[0].balance(),
+        accounts[1].balance(),
+    ]
+
+
+def test_batches(accounts, Multicall2, token):
+    multicall = Multicall(Multicall2.deploy({"from": accounts[0]}), batch_size=3)
+    calls = [(token, token.balanceOf, (acct,)) for acct in accounts[:10]]
+
+    assert multicall(calls) == [token.balanceOf(i) for i in accounts[:10]]
@@ -0,0 +1,93 @@
+import brownie
+import pytest
+
+from scripts.deployment.vesting_tree import VestingTree
+
+AMOUNTS = [10 ** 20, 3 * 10 ** 19, 7 * 10 ** 18, 10 ** 18, 5 * 10 ** 17]
+
+
+@pytest.fixture(scope="module")
+def tree(accounts):
+    yield VestingTree(dict(zip(accounts[1:6], AMOUNTS)))
+
+
+@pytest.fixture(scope="module")
+def deploy_merkle(VestingEscrowMerkle, accounts, coin_a, start_time, end_time, tree):
+    def deploy(funded_amount):
+        contract = VestingEscrowMerkle.deploy(
+            coin_a, start_time, end_time, True, tree.root, tree.total, {"from": accounts[0]}
+        )
+        coin_a._mint_for_testing(accounts[0], funded_amount)
+        coin_a.approve(contract, funded_amount, {"from": accounts[0]})
+        contract.add_tokens(funded_amount, {"from": accounts[0]})
+        return contract
+
+    yield deploy
+
+
+@pytest.fixture(scope="module")
+def vesting_merkle(deploy_merkle, tree):
+    yield deploy_merkle(tree.total)
+
+
+def test_verify_proof(accounts, vesting_merkle, tree):
+    for acct, amount in zip(accounts[1:6], AMOUNTS):
+        assert vesting_merkle.verify_proof(acct, amount, tree.proof(acct))
+        assert not vesting_merkle.verify_proof(acct, amount + 1, tree.proof(acct))
+
+
+def test_register(accounts, vesting_merkle, tree):
+    vesting_merkle.register(accounts[2], AMOUNTS[1], tree.proof(accounts[2]), {"from": accounts[0]})
+
+    assert vesting_merkle.initial_locked(accounts[2]) == AMOUNTS[1]
+    assert vesting_merkle.initial_locked_supply() == AMOUNTS[1]
+    assert vesting_merkle.unallocated_supply() == tree.total - AMOUNTS[1]
+
+
+def test_register_twice(accounts, vesting_merkle, tree):
+    vesting_merkle.register(accounts[1], AMOUNTS[0], tree.proof(accounts[1]), {"from": accounts[1]})
+
+    with brownie.reverts("dev: already registered"):
+        vesting_merkle.register(
+            accounts[1], AMOUNTS[0], tree.proof(accounts[1]), {"from": accounts[1]}
+        )
+
+
+def test_invalid_proof(accounts, vesting_merkle, tree):
+    with brownie.reverts("dev: invalid proof"):
+        vesting_merkle.register(
+            accounts[1], AMOUNTS[0] * 2, tree.proof(accounts[1]), {"from": accounts[1]}
+        )
+    with brownie.reverts("dev: invalid proof"):
+        vesting_merkle.register(
+            accounts[6], AMOUNTS[0], tree.proof(accounts[1]), {"from": accounts[6]}
+        )
+
+
+def test_register_and_claim(accounts, chain, coin_a, vesting_merkle, tree, end_time):
+    chain.sleep(end_time - chain.time())
+    vesting_merkle.register_and_claim(
+        accounts[5], AMOUNTS[4], tree.proof(accounts[5]), {"from": accounts[0]}
+    )
+
+    assert coin_a.balanceOf(accounts[5]) == AMOUNTS[4]
+    assert vesting_merkle.total_claimed(accounts[5]) == AMOUNTS[4]
+
+
+def test_underfunded(accounts, chain, coin_a, deploy_merkle, tree, end_time):
+    # only enough for the first allocation
+    vesting_merkle = deploy_merkle(AMOUNTS[0])
+    assert vesting_merkle.merkle_total() == tree.total
+    assert vesting_merkle.initial_locked_supply() == 0
+
+    vesting_merkle.register(accounts[1], AMOUNTS[0], tree.proof(accounts[1]), {"from": accounts[1]})
+    with brownie.reverts("dev: insufficient funding"):
+        vesting_merkle.register(
+            accounts[2], AMOUNTS[1], tree.proof(accounts[2]), {"from": accounts[2]}
+        )
+
+    chain.sleep(end_time - chain.time())
+    vesting_merkle.claim({"from": accounts[1]})
+    assert coin_a.balanceOf(accounts[1]) == AMOUNTS[0]
+    assert vesting_merkle.initial_locked_supply() == AMOUNTS[0]
+    assert vesting_merkle.balanceOf(accounts[2]) == 0
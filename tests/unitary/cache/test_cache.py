@@ -0,0 +1,46 @@
+import pytest
+
+from scripts import cache
+
+
+@pytest.fixture(autouse=True)
+def cache_path(monkeypatch, tmp_path):
+    monkeypatch.setattr(cache, "CACHE_PATH", tmp_path)
+    monkeypatch.setattr(cache, "_namespaces", {})
+    yield tmp_path
+
+
+def test_round_trip(cache_path):
+    cache.store("test", "key", {"a": [1, 2]})
+    cache.store_many("test", {"b": "0x00", "c": None})
+
+    # read back from disk, not the in-memory copy
+    cache._namespaces.clear()
+    assert cache.load("test", "key") == {"a": [1, 2]}
+    assert cache.load("test", "b") == "0x00"
+    assert cache.load("test", "missing") is None
+    assert not list(cache_path.glob("**/*.tmp"))
+
+
+def test_max_age():
+    cache.store("test", "key", 42, block=100)
+
+    assert cache.load("test", "key", block=150, max_age=100) == 42
+    assert cache.load("test", "key", block=200, max_age=100) == 42
+    assert cache.load("test", "key", block=201, max_age=100) is None
+    # stored after the requested block
+    assert cache.load("test", "key", block=99) is None
+
+
+def test_unpinned_entry_ignored_for_block():
+    cache.store("test", "key", 42)
+
+    assert cache.load("test", "key") == 42
+    assert cache.load("test", "key", block=100) is None
+
+
+def test_development_chain_key(cache_path):
+    cache.store("test", "key", 1)
+
+    (chain_dir,) = cache_path.iterdir()
+    assert chain_dir.name.endswith("-development")
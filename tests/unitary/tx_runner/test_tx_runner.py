@@ -0,0 +1,80 @@
+import pytest
+
+from scripts import tx_runner
+from scripts.tx_runner import TxRunner
+
+
+@pytest.fixture(autouse=True)
+def no_polling_delay(monkeypatch):
+    monkeypatch.setattr(tx_runner, "POLL_INTERVAL", 0)
+
+
+class StuckTx:
+    # stand-in for a transaction that is never mined, however high its fees
+    status = -1
+    txid = "0x00"
+
+    def replace(self, increment):
+        return StuckTx()
+
+
+def test_sequential_nonces(accounts, token):
+    start = accounts[0].nonce
+    runner = TxRunner(accounts[0])
+    for i in range(3):
+        runner.submit(i, token.transfer, accounts[1], 10 ** 18)
+    txs = list(runner.wait().values())
+
+    assert runner.nonce == start + 3
+    assert [tx.nonce for tx in txs] == [start, start + 1, start + 2]
+    assert [tx.status for tx in txs] == [1, 1, 1]
+    assert token.balanceOf(accounts[1]) == 3 * 10 ** 18
+
+
+def test_max_in_flight_blocks(accounts, token, monkeypatch):
+    runner = TxRunner(accounts[0], max_in_flight=1)
+    runner.submit("first", token.transfer, accounts[1], 10 ** 18)
+
+    # report the first transaction as pending for a few polls
+    polls = []
+
+    def pending():
+        polls.append(len(runner.transactions))
+        return ["first"] if len(polls) < 4 else []
+
+    monkeypatch.setattr(runner, "pending", pending)
+    runner.submit("second", token.transfer, accounts[1], 10 ** 18)
+
+    # `submit` kept polling, without broadcasting, until the first transaction cleared
+    assert len(polls) > 3
+    assert set(polls) == {1}
+    assert list(runner.transactions) == ["first", "second"]
+
+
+def test_reverted_tx(accounts, token):
+    runner = TxRunner(accounts[1])
+    # `accounts[1]` holds no tokens, so the transfer reverts
+    runner.submit(
+        "revert",
+        token.transfer,
+        accounts[2],
+        10 ** 18,
+        tx_params={"gas_limit": 200000, "allow_revert": True},
+    )
+
+    results = runner.wait()
+    assert results["revert"].status == 0
+
+
+def test_bumps_exhausted(accounts):
+    runner = TxRunner(accounts[0], stuck_timeout=0, max_bumps=2)
+    runner.transactions["stuck"] = [StuckTx()]
+    runner._submitted_at["stuck"] = 0
+
+    with pytest.raises(TimeoutError, match="stuck"):
+        runner.wait()
+
+    # the original broadcast and two replacements
+    assert len(runner.transactions["stuck"]) == 3
+    assert runner.pending() == ["stuck"]
+    assert runner.results() == {"stuck": None}